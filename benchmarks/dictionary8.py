@@ -0,0 +1,69 @@
+import sys
+import os
+import time
+
+# Benchmarks run against the code under `/src`.
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+import pandas as pd
+
+from composition.charclass import dict_normalise
+from composition.policy import complies, load_dict
+from composition.vectorized import complies_mask
+
+
+""" Compares trusted-mode filtration under the `dictionary8` policy with the dictionary held as a list (as it used to
+be, one linear scan per password) against the dictionary held as a set.
+"""
+
+
+# The dictionary used by the `dictionary8` policy.
+DICT_PATH = os.path.join(SRC_DIR, 'dict', 'openwall-tiny.dict')
+
+# The distribution to filter.
+DATA_PATH = os.path.join(SRC_DIR, '..', 'data', 'singles.probs')
+
+
+def complies_list (val, dict_list):
+    """ Checks `dictionary8` compliance the old way, scanning the dictionary as a list.
+
+    Args:
+        val (str): The string to check.
+        dict_list (list of str): The dictionary, as loaded before it became a set.
+    Returns:
+        bool: True if the string is compliant, otherwise false.
+    """
+    return not dict_normalise(val) in dict_list and complies(val, 8) # Dictionary was always checked first.
+
+
+def time_call (func):
+    """ Times a single call to a function.
+
+    Args:
+        func (function): The function to call.
+    Returns:
+        pair: The number of seconds taken and the function's return value, in a pair.
+    """
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+# Load inputs up front so only filtration is timed.
+pwds = [str(pwd) for pwd in pd.read_csv(DATA_PATH, skipinitialspace=True)['password']]
+with open(DICT_PATH) as target:
+    dict_list = [entry.strip() for entry in target]
+spec = ['dict:' + DICT_PATH]
+load_dict(DICT_PATH)
+
+# Time each approach.
+before, expected = time_call(lambda: [complies_list(pwd, dict_list) for pwd in pwds])
+after, actual = time_call(lambda: [complies(pwd, 8, spec=spec) for pwd in pwds])
+vectorized, mask = time_call(lambda: complies_mask(pd.Series(pwds), 8, spec=spec))
+assert expected == actual == list(mask), 'Filtration results differ!'
+
+print(f'{len(pwds)} passwords, {len(dict_list)} dictionary entries, {sum(actual)} compliant')
+print(f'list lookup (before): {before:.3f}s')
+print(f'set lookup (after):   {after:.3f}s ({before / after:.0f}x)')
+print(f'set lookup, vectorized: {vectorized:.3f}s ({before / vectorized:.0f}x)')
@@ -0,0 +1,271 @@
+import sys
+import os
+import json
+import time
+import shutil
+import platform
+import tempfile
+import subprocess
+
+# Benchmarks run against the code under `/src`, which expects to run from there.
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+import numpy as np
+import pandas as pd
+
+from shared.args import is_arg_passed, get_valued_arg, get_int_valued_arg, split_multi_arg
+from model.Policy import Policy, POLICY_FILE
+from engine.authority import Authority
+from engine.asyncauth import AsyncAuthority
+from engine.distribution import load_distribution
+from engine.filtration import filter_policy, filter_authority, filter_mask
+from engine import distcache
+from engine.features import load_features, FEATURES_DIR_NAME
+from engine.reselection import reselect
+from engine.guessing import guess_optimally
+from engine.fitting import rank_values, fit_powerlaw
+
+
+""" Times every stage of the pipeline on synthetic password probability distributions of a range of sizes, recording
+results as JSON so that they can be compared across commits.
+"""
+
+
+# The distribution whose fitted power law synthetic distributions follow, unless one is given.
+MODEL_PATH = os.path.join(SRC_DIR, '..', 'data', 'singles.probs')
+
+# The mock authority to filter against.
+MOCK_AUTHORITY_PATH = os.path.join(SRC_DIR, '..', 'authorities', 'mock.authority')
+
+# The characters synthetic passwords are made of.
+SYNTH_ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ!@#$%&*'
+
+# The number of synthetic passwords to generate and write at a time.
+SYNTH_CHUNK_SIZE = 10 ** 6
+
+# The shortest and longest synthetic passwords.
+SYNTH_MIN_LENGTH = 4
+SYNTH_MAX_LENGTH = 14
+
+# Defaults for options.
+DEFAULT_SIZES = [10 ** 4, 10 ** 5]
+DEFAULT_POLICY = 'basic8'
+DEFAULT_MODES = ['proportional', 'uniform', 'convergent', 'extraneous']
+DEFAULT_AUTH_LIMIT = 10 ** 6
+DEFAULT_REPEATS = 1
+
+
+def print_usage (show_help_line=False):
+    """ Prints the short help card for the program.
+
+    Args:
+        show_help_line (bool): If true, information on help flag `-h` will be printed.
+    """
+    print('Usage: python pipeline.py [-h] [-n <sizes>] [-p <policy>] [-m <modes>] [-alpha <exp>] [-r <repeats>] [-authmax <rows>] [-w <windows>] [-o <outfile>]')
+    print('Times every stage of the pipeline on synthetic Zipf-distributed password probability distributions.')
+    if show_help_line:
+        print('For extended help use \'-h\' option.')
+
+
+def print_help ():
+    """ Prints the full help card for the program.
+    """
+    print_usage()
+    print('Options:')
+    print('\t-h: Show this help screen')
+    print('\t-n <str>: The numbers of rows to benchmark, separated by semicolons [10000;100000]')
+    print('\t-p <str>: The named policy to filter by, must be understood by the mock authority [basic8]')
+    print('\t-m <str>: The reselection modes to time, separated by semicolons [proportional;uniform;convergent;extraneous]')
+    print('\t-alpha <float>: The power-law exponent of synthetic distributions [1]')
+    print('\t-r <int>: Time each stage this many times, keeping the fastest [1]')
+    print('\t-authmax <int>: Skip authority filtration for more rows than this [1000000]')
+    print('\t-w <str>: Also time the pipelined authority client with each of these windows, separated by semicolons')
+    print('\t-o <str>: The file in which to place JSON results (standard output if not given)')
+    print('Notes:')
+    print('\t[1]: Defaults to the exponent of the power law fitted to \'' + MODEL_PATH + '\' (see zipf.py)')
+
+
+def synthesize (rows, alpha, rng, file):
+    """ Writes a synthetic password probability distribution following a power law to a CSV file, out of order.
+
+    Passwords are generated and written a chunk at a time, so that memory use doesn't grow with the number of rows.
+
+    Args:
+        rows (int): The number of passwords.
+        alpha (float): The exponent of the power law (negative).
+        rng (Generator): The random number generator to use.
+        file (str): The path of the CSV file to write.
+    """
+    # Probabilities follow the same power law zipf.py fits, normalised to sum to 1 (so amplitude doesn't matter).
+    starts = range(0, rows, SYNTH_CHUNK_SIZE)
+    total = sum((np.arange(start + 1, min(start + SYNTH_CHUNK_SIZE, rows) + 1, dtype=float) ** alpha).sum()
+        for start in starts)
+    chars = np.array(list(SYNTH_ALPHABET) + ['\0'])
+    with open(file, 'w', encoding='utf-8', newline='') as target:
+        target.write('password,probability\n')
+        # Write chunks in a random order, each shuffled, so that sorting has work to do.
+        for start in rng.permutation(len(starts)) * SYNTH_CHUNK_SIZE:
+            count = min(SYNTH_CHUNK_SIZE, rows - start)
+            probs = np.arange(start + 1, start + count + 1, dtype=float) ** alpha / total
+            # Trailing null characters don't count in NumPy strings, so padding gives passwords of varying lengths.
+            lengths = rng.integers(SYNTH_MIN_LENGTH, SYNTH_MAX_LENGTH + 1, size=count, dtype=np.uint8)
+            picks = rng.integers(0, len(SYNTH_ALPHABET), size=(count, SYNTH_MAX_LENGTH), dtype=np.uint8)
+            picks[np.arange(SYNTH_MAX_LENGTH) >= lengths[:, None]] = len(SYNTH_ALPHABET)
+            pwds = np.ascontiguousarray(chars[picks]).view(f'<U{SYNTH_MAX_LENGTH}').ravel()
+            order = rng.permutation(count)
+            pd.DataFrame({'password': pwds[order], 'probability': probs[order]}).to_csv(target, header=False,
+                index=False)
+
+
+def time_best (func, repeats):
+    """ Times a function, keeping the fastest of a number of calls.
+
+    Args:
+        func (function): The function to call.
+        repeats (int): The number of times to call it.
+    Returns:
+        pair: The fewest seconds taken and the function's return value from the last call, in a pair.
+    """
+    best = None
+    for i in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def analyse_features (file, df):
+    """ Computes the feature matrix of a distribution from scratch, discarding any that's kept.
+
+    Args:
+        file (str): The path of the CSV file the distribution was loaded from.
+        df (DataFrame): The distribution.
+    Returns:
+        FeatureMatrix: The feature matrix.
+    """
+    shutil.rmtree(os.path.join(distcache.lookup(file), FEATURES_DIR_NAME), ignore_errors=True)
+    return load_features(file, df)
+
+
+def git_commit ():
+    """ Gets the commit the benchmarked code is at, if it's in a Git repository.
+
+    Returns:
+        str: The commit hash, or none if it can't be found.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=SRC_DIR, capture_output=True, text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_size (rows, alpha, policy, modes, repeats, auth_limit, windows, dir, rng):
+    """ Times every stage of the pipeline on one synthetic distribution.
+
+    Args:
+        rows (int): The number of passwords.
+        alpha (float): The exponent of the power law (negative).
+        policy (Policy): The policy to filter by.
+        modes (list of str): The reselection modes to time.
+        repeats (int): The number of times to time each stage.
+        auth_limit (int): The most rows to filter with the mock authority.
+        windows (list of int): The windows to time the pipelined authority client with.
+        dir (str): A directory for temporary files.
+        rng (Generator): The random number generator to use.
+    Returns:
+        dict: The seconds taken by each stage, by name.
+    """
+    timings = {}
+    file = os.path.join(dir, f'synthetic{rows}.probs')
+    synthesize(rows, alpha, rng, file)
+
+    # Loading, without and with a cached copy.
+    timings['load_csv'], unsorted = time_best(lambda: load_distribution(file, cache=False, sort=False), repeats)
+    timings['sort'], df = time_best(lambda: unsorted.sort_values(by=['probability'], ascending=False), repeats)
+    load_distribution(file) # Keeps a cached copy.
+    timings['load_cached'], df = time_best(lambda: load_distribution(file), repeats)
+
+    # Filtration, in trusted mode and against the mock authority.
+    timings['filter_trusted'], filtration = time_best(lambda: filter_policy(df, policy), repeats)
+    timings['features'], features = time_best(lambda: analyse_features(file, df), repeats)
+    timings['filter_features'], _ = time_best(lambda: filter_mask(df, features.mask(policy)), repeats)
+    if rows <= auth_limit:
+        def filter_mock ():
+            auth = Authority(MOCK_AUTHORITY_PATH, policy.name)
+            try:
+                return filter_authority(df, auth)
+            finally:
+                auth.terminate()
+        timings['filter_authority'], _ = time_best(filter_mock, repeats)
+        for window in windows:
+            def filter_async ():
+                auth = AsyncAuthority(MOCK_AUTHORITY_PATH, policy.name, window)
+                try:
+                    return filter_authority(df, auth)
+                finally:
+                    auth.terminate()
+            timings[f'filter_authority_async{window}'], _ = time_best(filter_async, repeats)
+
+    # Reselection in each mode, then guessing and fitting on the first.
+    resel = None
+    for mode in modes:
+        timings[f'reselect_{mode}'], result = time_best(lambda: reselect(mode, filtration), repeats)
+        resel = result if resel is None else resel
+    if resel is not None:
+        timings['guess_percentile'], _ = time_best(lambda: guess_optimally(resel, True), repeats)
+        timings['guess_full'], _ = time_best(lambda: guess_optimally(resel), repeats)
+        timings['fit'], _ = time_best(lambda: fit_powerlaw(*rank_values(resel)), repeats)
+    return timings
+
+
+# If help flag specified, print help and exit.
+if is_arg_passed('h'):
+    print_help()
+    exit(0)
+
+# Get options, resolving the output path before moving to the source directory.
+sizes = [int(float(size)) for size in split_multi_arg(get_valued_arg('n'))] if is_arg_passed('n') else DEFAULT_SIZES
+modes = split_multi_arg(get_valued_arg('m')) if is_arg_passed('m') else DEFAULT_MODES
+repeats = get_int_valued_arg('r') or DEFAULT_REPEATS
+auth_limit = get_int_valued_arg('authmax') or DEFAULT_AUTH_LIMIT
+windows = [int(window) for window in split_multi_arg(get_valued_arg('w'))] if is_arg_passed('w') else []
+out = os.path.abspath(get_valued_arg('o')) if is_arg_passed('o') else None
+os.chdir(SRC_DIR)
+sys.path.insert(0, './modes/')
+policy_name = get_valued_arg('p') if is_arg_passed('p') else DEFAULT_POLICY
+policy = Policy.load(POLICY_FILE)[policy_name]
+
+# Follow the power law fitted to real data unless told otherwise.
+if is_arg_passed('alpha'):
+    alpha = float(get_valued_arg('alpha'))
+else:
+    alpha = fit_powerlaw(*rank_values(load_distribution(MODEL_PATH, cache=False)))['alpha']
+
+# Run benchmarks, smallest first.
+rng = np.random.default_rng(0)
+results = []
+with tempfile.TemporaryDirectory() as dir:
+    for rows in sorted(sizes):
+        print(f'Benchmarking {rows} rows...', file=sys.stderr)
+        results.append({'rows': rows, 'seconds': bench_size(rows, alpha, policy, modes, repeats, auth_limit, windows, dir, rng)})
+
+# Record results with enough context to compare them later.
+report = {
+    'commit': git_commit(),
+    'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    'python': platform.python_version(),
+    'numpy': np.__version__,
+    'pandas': pd.__version__,
+    'machine': platform.machine(),
+    'cpus': os.cpu_count(),
+    'params': {'alpha': alpha, 'policy': policy_name, 'modes': modes, 'repeats': repeats, 'windows': windows},
+    'results': results,
+}
+if out is None:
+    print(json.dumps(report, indent=2))
+else:
+    with open(out, 'w') as target:
+        json.dump(report, target, indent=2)
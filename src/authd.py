@@ -0,0 +1,78 @@
+import sys
+import os
+import signal
+
+from engine.authority import AUTH_READY_TIMEOUT
+from engine.daemon import serve, daemon_socket_path, DAEMON_IDLE_TIMEOUT
+
+from shared.args import get_valued_arg, is_arg_passed, get_int_valued_arg
+
+
+def print_usage (show_help_line=False):
+    """ Prints the short help card for the program.
+    Args:
+        show_help_line (bool): If true, information on help flag `-h` will be printed.
+    """
+    print('Usage: python authd.py [-h] -a <authority> -p <policy> [-j <workers>] [-idle <secs>] [-timeout <secs>] [-socket <path>]')
+    print('Runs a Skeptic Authority as a daemon, shared by every filtration using the same authority and policy.')
+    if show_help_line:
+        print('For extended help use \'-h\' option.')
+
+
+def print_help ():
+    """ Prints the full help card for the program.
+    """
+    print_usage()
+    print('Options:')
+    print('\t-h: Show this help screen')
+    print('\t-a <str>: The file path of the authority executable to use')
+    print('\t-p <str>: The name of the policy to pass to the authority')
+    print('\t-j <int>: The number of authority processes to check passwords with concurrently (1 by default)')
+    print(f'\t-idle <float>: Seconds to wait without any clients before exiting ({DAEMON_IDLE_TIMEOUT} by default)')
+    print(f'\t-timeout <float>: Seconds to wait for the authority to report that it\'s ready ({AUTH_READY_TIMEOUT} by default)')
+    print('\t-socket <str>: The Unix domain socket to listen on [1]')
+    print('Notes:')
+    print('\t[1]: By default, derived from the authority and policy so that clients can find it, in a directory private to')
+    print('\t\tthis user under $XDG_RUNTIME_DIR or the temporary directory (see engine/daemon.py)')
+    print('\t\tThere\'s no need to run this by hand, authfilt.py and pyrrho.py start it when passed \'-d\'')
+
+
+# If no options specified, print usage and exit.
+if len(sys.argv) == 1:
+    print_usage(True)
+    exit(0)
+
+# If help flag specified, print help and exit.
+if is_arg_passed('h'):
+    print_help()
+    exit(0)
+
+# Both authority and policy are required.
+authority = get_valued_arg('a')
+policy = get_valued_arg('p')
+if authority is None or policy is None:
+    print_usage(True)
+    sys.exit(1)
+
+# Check the authority file exists.
+if not os.path.isfile(authority):
+    print('Authority file \'' + authority + '\' not found.', file=sys.stderr)
+    sys.exit(1)
+
+# Get options.
+workers = get_int_valued_arg('j')
+idle_timeout = DAEMON_IDLE_TIMEOUT if not is_arg_passed('idle') else float(get_valued_arg('idle'))
+ready_timeout = AUTH_READY_TIMEOUT if not is_arg_passed('timeout') else float(get_valued_arg('timeout'))
+try:
+    path = get_valued_arg('socket') if is_arg_passed('socket') else daemon_socket_path(authority, policy)
+except OSError as err:
+    print(f'Can\'t use authority daemon ({err}).', file=sys.stderr)
+    sys.exit(1)
+
+# Clean up the socket and authority when asked to stop, as well as when idle.
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+# Serve until idle, unless another daemon is already serving.
+if not serve(os.path.abspath(authority), policy, path, workers, idle_timeout, ready_timeout):
+    print('Authority daemon not started, another may already be running or the authority failed to launch.', file=sys.stderr)
+    sys.exit(1)
@@ -1,16 +1,19 @@
 import sys
 import os
-import time
 import string
 import random
-from subprocess import *
-from math import floor
 
-import numpy as np
-import pandas as pd
+from engine.authority import Authority, AuthorityError, AUTH_READY_TIMEOUT
+from engine.authpool import AuthorityPool
+from engine.asyncauth import AsyncAuthority
+from engine.verdicts import CachedAuthority
+from engine.daemon import DaemonAuthority
+from engine.distribution import load_distribution
+from engine.filtration import filter_authority
+from engine.reselection import write_reselected
+from engine.streaming import filter_streaming
 
 from shared.args import get_valued_arg, is_arg_passed, get_int_valued_arg
-from shared.moduleloading import load_resel_mode
 
 
 def print_usage (show_help_line=False):
@@ -18,7 +21,7 @@ def print_usage (show_help_line=False):
     Args:
         show_help_line (bool): If true, information on help flag `-h` will be printed.
     """
-    print('Usage: python authfilt.py [-hi] [-a <authority>] [-p <policy>] [-m <renorm_mode>] [-o <outfile>] <infile>')
+    print('Usage: python authfilt.py [-hisd] [-a <authority>] [-p <policy>] [-j <workers>] [-w <window>] [-timeout <secs>] [-nocache] [-m <renorm_mode>] [-chunk <rows>] [-x] [-o <outfile>] <infile>')
     print('Filters a CSV file of password probabilities according to an authority and redistributes filtered probabilities according to a reselection mode.')
     if show_help_line:
         print('For extended help use \'-h\' option.')
@@ -36,6 +39,14 @@ def print_help ():
     print('\t-p <str>: The name of the policy to pass to the authority')
     print('\t-m <int>: Choose a probability redistribution mode [1]')
     print('\t-i: Invert policy (filter all accepted, output only rejected)')
+    print('\t-j <int>: The number of authority processes to check passwords with concurrently (1 by default)')
+    print('\t-w <int>: Keep this many passwords in flight to a single authority at once, reporting throughput and latency [6]')
+    print('\t-timeout <float>: Seconds to wait for the authority to report that it\'s ready (30 by default)')
+    print('\t-d: Share a long-lived authority daemon with other filtrations using the same authority and policy [5]')
+    print('\t-nocache: Ask the authority about every password, rather than only those it hasn\'t been asked about before [4]')
+    print('\t-s: Ask the authority one password at a time instead of in batches (for older authorities)')
+    print('\t-chunk <int>: Stream the input this many rows at a time instead of loading it into memory [2]')
+    print('\t-x: Write out every password literally, even where the reselection mode adds many at once [3]')
     print('\t-o <str>: The file in which to place output')
     print('Notes:')
     print('\t[1]: Bundled redistribution modes include:')
@@ -45,6 +56,14 @@ def print_help ():
     print('\t\tconvergent: Convergent reselection mode, places probability from all eliminated outcomes into most frequent outcome')
     print('\t\textraneous: Extraneous reselection mode, uniformly redistributes probability of eliminated outcomes to random passwords outside the set')
     print('\t\custom: You may add your own reselection modes as Python files in the `./modes` folder')
+    print('\t[2]: Streamed output keeps the input order, and modes that don\'t declare a transform (such as extraneous)')
+    print('\t\tstill need every compliant row in memory at once')
+    print('\t[3]: Extraneous mode otherwise adds a single row with an extra `count` column, standing for that many random')
+    print('\t\tpasswords with the same probability, which optimalguess.py and zipf.py understand')
+    print('\t[4]: Verdicts are cached by authority binary, policy and password in \'.pyrrho/verdicts.sqlite\' next to the authority')
+    print('\t[5]: The daemon (see authd.py) is started if it isn\'t running, and exits after a minute without clients')
+    print('\t[6]: Passwords are written to the authority while verdicts are read back, so neither waits on the other')
+    print('\t\tA larger window keeps the authority busier at the cost of latency, try a few for each authority')
     print()
     print('Input file should be in CSV format:')
     print('\tpassword, probability, ... <- Column headers')
@@ -57,16 +76,6 @@ def print_help ():
 sys.path.insert(0, './modes/')
 
 
-# The total number of passwords the authority will ask for. Setting this too high will cause a stack overflow!
-GL_BATCH_SIZE = 20000
-
-# The total number of times to attempt to launch the authority.
-AUTH_LAUNCH_RETRIES = 5
-
-# The authority process (global).
-gl_auth_proc = None
-
-
 def gen_rand_pass (len):
     """ Generates a random password.
 
@@ -81,54 +90,6 @@ def gen_rand_pass (len):
     return ''.join(random.choice(alpha) for i in range(len))
 
 
-def try_launch_auth (file, policy):
-    """ Attempts to launch the global authority.
-
-    Args:
-        file (str): The binary file to execute.
-        policy (str): The name of the policy to call the file with.
-    """
-    global gl_auth_proc # We need to assign to this global.
-    gl_auth_proc = (None, file, policy)
-    success = False
-    retries = 0
-    while not success and retries <= AUTH_LAUNCH_RETRIES: # We might need to retry this several times.
-        try:
-            gl_auth_proc = (Popen([file, policy, str(GL_BATCH_SIZE)], stdin=PIPE, stdout=PIPE), file, policy)
-            time.sleep(2 * (retries + 1)) # Wait, it might exit immediately if parameters are incorrect.
-            success = gl_auth_proc[0].poll() == None
-            if success:
-                # Wait for state to come back from launched authority.
-                state = gl_auth_proc[0].stdout.readline().decode().strip().lower()
-                if state != "ready":
-                    success = false
-        except:
-            print(f'Authority launch failed, retrying (attempt {retries + 1} of {AUTH_LAUNCH_RETRIES})...', file=sys.stderr)
-        retries += 1
-    return success
-
-
-def ask_auth (pwd):
-    """ Checks with the authority whether or not a password is permitted.
-
-    Args:
-        pwd (str): The password to check.
-    Returns:
-        bool: True if the password is permitted, otherwise False.
-    """
-    # Relaunch process if necessary.
-    poll = gl_auth_proc[0].poll()
-    if poll != None and not try_launch_auth(gl_auth_proc[1], gl_auth_proc[2]):
-        print('Authority launch failed completely, aborting...', file=sys.stderr)
-        exit(1)
-    # Pass password into authority (don't forget to flush).
-    gl_auth_proc[0].stdin.write(f'{pwd}\n'.encode())
-    gl_auth_proc[0].stdin.flush()
-    # Return result, cast to boolean.
-    buffer = gl_auth_proc[0].stdout.readline()
-    return buffer.decode().strip().lower() == 'true'
-
-
 # If no options specified, print usage and exit.
 if len(sys.argv) == 1:
     print_usage(True)
@@ -151,13 +112,30 @@ if not os.path.isfile(file):
 authority = get_valued_arg('a')
 policy = get_valued_arg('p')
 invert = is_arg_passed('i')
+batched = not is_arg_passed('s')
+workers = get_int_valued_arg('j')
+window = get_int_valued_arg('w')
+if window is not None and window < 1:
+    print('Window must be at least 1 password.', file=sys.stderr)
+    sys.exit(1)
+timeout = AUTH_READY_TIMEOUT if not is_arg_passed('timeout') else float(get_valued_arg('timeout'))
 
 # Check the authority file exists.
 if not os.path.isfile(authority):
     print('Authority file \'' + file + '\' not found.', file=sys.stderr)
 
-# Check we can launch it.
-if not try_launch_auth(authority, policy):
+# Check we can launch it (or connect to a daemon running it).
+if is_arg_passed('d'):
+    auth = DaemonAuthority(authority, policy, workers, timeout)
+elif window is not None:
+    auth = AsyncAuthority(authority, policy, window, timeout)
+elif workers is None:
+    auth = Authority(authority, policy, batched, timeout)
+else:
+    auth = AuthorityPool(authority, policy, workers, batched, timeout)
+if not is_arg_passed('nocache'):
+    auth = CachedAuthority(auth)
+if not auth.try_launch():
     print('Could not launch authority \'' + authority + '\', check policy name and executable flag.', file=sys.stderr)
     sys.exit(1)
 
@@ -167,37 +145,50 @@ resel_mode = None if not is_arg_passed('m') else get_valued_arg('m')
 # Get output path if one was specified.
 out = get_valued_arg('o')
 
-# Read data frame from file.
-df = pd.read_csv(file, skipinitialspace=True, skip_blank_lines=True)
-
-# Sort by probability and reset index.
-df.sort_values(by=['probability'], ascending=False, inplace=True)
-df.reset_index(drop=True, inplace=True)
-
-# Get total probability.
-total_prob = df['probability'].sum()
-
-# Filter passwords and reset index again.
-df = df[df.apply(lambda x: invert ^ ask_auth(str(x['password'])), axis=1)]
-df.reset_index(drop=True, inplace=True)
+# Get chunk size if streaming.
+chunksize = get_int_valued_arg('chunk')
+
+# Write out literal passwords in place of rows standing for many?
+materialise = is_arg_passed('x')
+
+# Filter passwords, streaming through the file and writing output as we go if asked to.
+try:
+    if chunksize is not None:
+        ask_chunk = lambda chunk: [invert ^ verdict for verdict in auth.ask_many([str(pwd) for pwd in chunk['password']])]
+        filtration = filter_streaming(file, ask_chunk, out, resel_mode, chunksize, materialise)
+    else:
+        # Read data frame from file, sorted by probability.
+        df = load_distribution(file)
+        filtration = filter_authority(df, auth, invert)
+except AuthorityError as err:
+    print(err, 'Aborting...', file=sys.stderr)
+    exit(1)
 
 # Get rid of authority process.
-gl_auth_proc[0].terminate()
-
-# Get 'surplus' probability.
-filtered_prob = df['probability'].sum()
-surplus = total_prob - filtered_prob
-row_count = len(df.index)
+auth.terminate()
+
+# Report how long the authority took to become ready.
+launch_times = auth.launch_times
+print(f'Authority launched {len(launch_times)} time(s), mean latency {sum(launch_times) / len(launch_times):.3f}s.', file=sys.stderr)
+if isinstance(auth, CachedAuthority):
+    print(f'Verdict cache answered {auth.hits} of {auth.hits + auth.misses} password(s).', file=sys.stderr)
+    auth = auth.authority
+
+# Report how quickly a pipelined authority answered, for tuning its window.
+if isinstance(auth, AsyncAuthority):
+    stats = auth.stats()
+    print(f'Authority answered {stats["answered"]} password(s) at {stats["throughput"]:.0f}/s with a window of {window}, '
+        f'latency mean {stats["mean"] * 1000:.3f}ms, median {stats["median"] * 1000:.3f}ms, '
+        f'99th percentile {stats["p99"] * 1000:.3f}ms.', file=sys.stderr)
 
 # Detect incoming division by 0 and abort.
-if filtered_prob == 0:
+if filtration.is_empty():
     print('All passwords were filtered, nowhere to redistribute probability.')
     exit(0)
 
-# Different reselection modes.
-if resel_mode != None:
-    reselector = load_resel_mode(resel_mode)
-    df = reselector.reselect(total_prob, surplus, df)
+# Streamed output has already been written.
+if chunksize is not None:
+    exit(0)
 
-# Print data frame.
-df.to_csv(out if not out is None else sys.stdout, index=False)
+# Reselect according to mode, printing the result as we go.
+write_reselected(resel_mode, filtration, out if not out is None else sys.stdout, materialise)
@@ -1,4 +1,11 @@
 import re
+from collections import namedtuple
+
+
+""" Character features of a string, as computed by `analyse`.
+"""
+Features = namedtuple('Features', ['length', 'lowers', 'uppers', 'digits', 'symbols', 'letters', 'words', 'classes',
+    'has_rep', 'has_consec'])
 
 
 def is_symbol (c):
@@ -88,16 +95,14 @@ def count_words (val):
     Returns:
         int: The number of words in the string.
     """
-    current = 0
     count = 0
     in_word = False
-    while current < len(val):
-        if not in_word and val[current].isalpha():
+    for char in val:
+        if not in_word and char.isalpha():
             in_word = True
             count += 1
-        elif in_word and not val[current].isalpha():
+        elif in_word and not char.isalpha():
             in_word = False
-        current += 1
     return count
 
 
@@ -133,12 +138,7 @@ def contains_rep (val):
     Returns:
         bool: True if the string contains repetitions, otherwise false.
     """
-    current = 0
-    while current < len(val) - 1:
-        if val[current] == val[current + 1]:
-            return True
-        current += 1
-    return False
+    return any(a == b for a, b in zip(val, val[1:]))
 
 
 def contains_consec (val):
@@ -150,12 +150,7 @@ def contains_consec (val):
     Returns:
         bool: True if the string has consecutive characters, otherwise false.
     """
-    current = 0
-    while current < len(val) - 1:
-        if ord(val[current]) == ord(val[current + 1]) + 1 or ord(val[current]) == ord(val[current + 1]) - 1:
-            return True
-        current += 1
-    return False
+    return any(abs(ord(a) - ord(b)) == 1 for a, b in zip(val, val[1:]))
 
 
 def strip_non_lowers (val):
@@ -167,11 +162,7 @@ def strip_non_lowers (val):
     Returns:
         str: The string with all non-lowercase characters stripped from it.
     """
-    buffer = ""
-    for char in val:
-        if char.islower():
-            buffer += char
-    return buffer
+    return ''.join(char for char in val if char.islower())
 
 
 def dict_normalise (val):
@@ -184,3 +175,56 @@ def dict_normalise (val):
         str: The string converted to lowercase with all non-letter characters stripped from it.
     """
     return strip_non_lowers(val.lower())
+
+
+def analyse (val):
+    """ Computes all character features of a string in a single pass.
+
+    Args:
+        val (str): The string to analyse.
+
+    Returns:
+        Features: The length, character class counts, word count, number of character classes present, and whether or
+            not the string contains repeated or consecutive characters.
+    """
+    lowers = uppers = digits = letters = words = 0
+    has_rep = has_consec = False
+    in_word = False
+    prev = None
+    for char in val:
+        if char.islower():
+            lowers += 1
+        elif char.isupper():
+            uppers += 1
+        elif char.isdigit():
+            digits += 1
+        if char.isalpha():
+            letters += 1
+            if not in_word:
+                in_word = True
+                words += 1
+        else:
+            in_word = False
+        if prev is not None:
+            has_rep = has_rep or char == prev
+            has_consec = has_consec or abs(ord(char) - ord(prev)) == 1
+        prev = char
+    symbols = len(val) - lowers - uppers - digits
+    classes = (lowers > 0) + (uppers > 0) + (digits > 0) + (symbols > 0)
+    return Features(len(val), lowers, uppers, digits, symbols, letters, words, classes, has_rep, has_consec)
+
+
+def analyse_all (vals):
+    """ Computes all character features of each of a list of strings.
+
+    Args:
+        vals (list of str): The strings to analyse.
+
+    Returns:
+        Features: The features of the strings, with each field holding a tuple of that feature's values, one per
+            string, in order.
+    """
+    features = [analyse(val) for val in vals]
+    if not features:
+        return Features(*[() for field in Features._fields])
+    return Features(*zip(*features))
@@ -1,4 +1,5 @@
 import sys
+from functools import lru_cache
 
 from .charclass import *
 from .pindates import *
@@ -11,20 +12,42 @@ dict_cache = {}
 
 def load_dict (path):
     """ Loads a dictionary from a file and returns it.
+
+    Passwords are normalised before being looked up (see `dict_normalise`), so entries that aren't already in
+    normal form (e.g. comments) can never match and are left out.
+
     Args:
         path (str): The path from which to load the dictionary.
     Returns:
-        list of str: The requested dictionary.
+        frozenset of str: The requested dictionary.
     """
     if not path in dict_cache: # Load into cache if needed.
-        dict = []
         with open(path, 'r') as target:
-            for entry in target: # Load into memory.
-                dict.append(entry.strip()) # Strip whitespace.
-        dict_cache[path] = dict
+            entries = (entry.strip() for entry in target) # Strip whitespace.
+            dict_cache[path] = frozenset(entry for entry in entries if dict_normalise(entry) == entry)
     return dict_cache[path] # Get dictionary from cache.
 
 
+@lru_cache(maxsize=None)
+def parse_spec (spec):
+    """ Parses special additional requirements, loading any dictionaries they reference.
+
+    Results are cached, so requirements are only parsed once per policy rather than once per password.
+
+    Args:
+        spec (tuple of str): The special additional requirements (see `complies`).
+    Returns:
+        tuple of pair: Each requirement name with its dictionary (for `dict:<file>`) or none.
+    """
+    parsed = []
+    for req in spec:
+        if req.startswith('dict:'):
+            parsed.append(('dict', load_dict(req.split(':', 1)[1])))
+        else:
+            parsed.append((req, None))
+    return tuple(parsed)
+
+
 def complies (val, length=0, lowers=0, uppers=0, digits=0, others=0, letters=0, classes=0, words=0, spec=[], invert=False):
     """ Checks whether or not a string complies with a password policy.
     Special additional requirements include:
@@ -47,22 +70,23 @@ def complies (val, length=0, lowers=0, uppers=0, digits=0, others=0, letters=0,
     Returns:
         bool: True if the string is compliant, otherwise false.
     """
+    features = analyse(val)
     complies_spec = True
-    for req in spec:
+    for req, dict in parse_spec(tuple(spec)):
         if req == 'norep':
-            complies_spec = complies_spec and not contains_rep(val)
+            complies_spec = complies_spec and not features.has_rep
         elif req == 'noconsec':
-            complies_spec = complies_spec and not contains_consec(val)
+            complies_spec = complies_spec and not features.has_consec
         elif req == 'nodate':
             complies_spec = complies_spec and not is_date(val)
-        elif req.startswith('dict:'):
-            complies_spec = complies_spec and not dict_normalise(val) in load_dict(req.split(':')[1])
-    return invert ^ (len(val) >= length and
-               count_lowers(val) >= lowers and
-               count_uppers(val) >= uppers and
-               count_digits(val) >= digits and
-               count_symbols(val) >= others and
-               count_classes(val) >= classes and
-               count_letters(val) >= letters and
-               count_words(val) >= words and
+        elif req == 'dict':
+            complies_spec = complies_spec and not dict_normalise(val) in dict
+    return invert ^ (features.length >= length and
+               features.lowers >= lowers and
+               features.uppers >= uppers and
+               features.digits >= digits and
+               features.symbols >= others and
+               features.classes >= classes and
+               features.letters >= letters and
+               features.words >= words and
                complies_spec)
@@ -0,0 +1,200 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from .charclass import Features, analyse, contains_consec, dict_normalise
+from .pindates import is_date
+from .policy import complies, parse_spec
+
+
+# Matches any character immediately followed by itself.
+REPEAT_PATTERN = re.compile(r'(.)\1', re.DOTALL)
+
+# The number of strings `analyse_series` analyses at once.
+ANALYSE_BLOCK_SIZE = 65536
+
+# The longest string `analyse_series` analyses as part of a block, longer ones are analysed one at a time.
+ANALYSE_MAX_WIDTH = 64
+
+
+def count_matches (pwds, pattern, mask):
+    """ Counts occurrences of a regular expression in each of a series of strings.
+
+    Args:
+        pwds (Series of str): The strings to count in.
+        pattern (str): The regular expression to count.
+        mask (ndarray of bool): True for each string to count in, others are given a count of 0.
+    Returns:
+        ndarray of int: The number of occurrences in each string.
+    """
+    counts = np.zeros(len(pwds), dtype=np.int64)
+    counts[mask] = pwds[mask].str.count(pattern).to_numpy()
+    return counts
+
+
+def complies_mask (pwds, length=0, lowers=0, uppers=0, digits=0, others=0, letters=0, classes=0, words=0, spec=[], invert=False):
+    """ Checks whether or not each of a series of strings complies with a password policy.
+
+    Equivalent to calling `complies` on each string, but computes character counts for the whole series at once
+    using pandas string operations, only computing those that the policy needs. Non-ASCII strings, for which the
+    Unicode semantics of `str.islower` and friends don't reduce to simple character ranges, are checked by calling
+    `complies` on them one at a time.
+
+    Args:
+        pwds (Series of str): The strings to check.
+        length (int): The minimum string length allowed.
+        lowers (int): The minimum number of lowercase letters allowed.
+        uppers (int): The minimum number of uppercase letters allowed.
+        digits (int): The minimum number of digits allowed.
+        others (int): The minimum number of symbols allowed.
+        letters (int): The minimum number of letters allowed.
+        classes (int): The minimum number of character classes allowed.
+        words (int): The minimum number of words allowed.
+        spec (list of str): Any special additional requirements (see `complies`).
+        invert (bool): Whether to not to invert the policy.
+    Returns:
+        ndarray of bool: True for each string that is compliant, otherwise false.
+    """
+    pwds = pd.Series(pwds, dtype=object).reset_index(drop=True)
+    ascii = ~pwds.str.contains(r'[^\x00-\x7f]', regex=True).to_numpy(dtype=bool)
+    out = pwds.str.len().to_numpy() >= length
+
+    # Count only the character classes the policy needs.
+    need_lowers = lowers > 0 or letters > 0 or others > 0 or classes > 0
+    need_uppers = uppers > 0 or letters > 0 or others > 0 or classes > 0
+    need_digits = digits > 0 or others > 0 or classes > 0
+    n_lowers = count_matches(pwds, r'[a-z]', ascii) if need_lowers else None
+    n_uppers = count_matches(pwds, r'[A-Z]', ascii) if need_uppers else None
+    n_digits = count_matches(pwds, r'[0-9]', ascii) if need_digits else None
+    if lowers > 0:
+        out &= n_lowers >= lowers
+    if uppers > 0:
+        out &= n_uppers >= uppers
+    if digits > 0:
+        out &= n_digits >= digits
+    if others > 0 or classes > 0:
+        # Symbols are whatever is left over.
+        n_others = pwds.str.len().to_numpy() - n_lowers - n_uppers - n_digits
+        out &= n_others >= others
+    if classes > 0:
+        out &= ((n_lowers > 0).astype(int) + (n_uppers > 0) + (n_digits > 0) + (n_others > 0)) >= classes
+    if letters > 0:
+        out &= n_lowers + n_uppers >= letters
+    if words > 0:
+        out &= count_matches(pwds, r'[A-Za-z]+', ascii) >= words
+
+    # Special additional requirements.
+    for req, dict in parse_spec(tuple(spec)):
+        if req == 'norep':
+            out &= ~pwds.map(lambda pwd: REPEAT_PATTERN.search(pwd) is not None).to_numpy(dtype=bool)
+        elif req == 'noconsec':
+            out &= ~pwds.map(contains_consec).to_numpy(dtype=bool)
+        elif req == 'nodate':
+            candidates = pwds.str.fullmatch(r'[0-9]{6}').to_numpy(dtype=bool)
+            out[candidates] &= ~pwds[candidates].map(is_date).to_numpy(dtype=bool)
+        elif req == 'dict':
+            normalised = pwds.str.lower().str.replace(r'[^a-z]', '', regex=True)
+            out &= ~normalised.map(dict.__contains__).to_numpy(dtype=bool)
+
+    # Fall back to checking non-ASCII strings one at a time.
+    if not ascii.all():
+        out[~ascii] = [complies(pwd, length, lowers, uppers, digits, others, letters, classes, words, spec)
+            for pwd in pwds[~ascii]]
+    return invert ^ out
+
+
+def analyse_codes (codes, lengths):
+    """ Computes all character features of a block of ASCII strings, given as a matrix of code points.
+
+    Args:
+        codes (ndarray of int): The code points of each string, one row per string, padded with zeros.
+        lengths (ndarray of int): The length of each string.
+    Returns:
+        dict: Arrays of each field of `Features`, by name, one value per string.
+    """
+    valid = np.arange(codes.shape[1]) < lengths[:, None]
+    is_lower = (codes >= ord('a')) & (codes <= ord('z'))
+    is_upper = (codes >= ord('A')) & (codes <= ord('Z'))
+    is_digit = (codes >= ord('0')) & (codes <= ord('9'))
+    is_letter = is_lower | is_upper
+    lowers = is_lower.sum(axis=1)
+    uppers = is_upper.sum(axis=1)
+    digits = is_digit.sum(axis=1)
+    symbols = lengths - lowers - uppers - digits # Symbols are whatever is left over.
+    # A word starts at each letter that doesn't follow another.
+    starts = is_letter.copy()
+    starts[:, 1:] &= ~is_letter[:, :-1]
+    # Compare each character with the one before it, within the string.
+    pairs = valid[:, 1:]
+    steps = codes[:, 1:].astype(np.int64) - codes[:, :-1]
+    return {
+        'length': lengths,
+        'lowers': lowers,
+        'uppers': uppers,
+        'digits': digits,
+        'symbols': symbols,
+        'letters': lowers + uppers,
+        'words': starts.sum(axis=1),
+        'classes': (lowers > 0).astype(np.int64) + (uppers > 0) + (digits > 0) + (symbols > 0),
+        'has_rep': (pairs & (steps == 0)).any(axis=1),
+        'has_consec': (pairs & (np.abs(steps) == 1)).any(axis=1),
+    }
+
+
+def analyse_series (pwds):
+    """ Computes all character features of each of a series of strings, plus whether each looks like a date.
+
+    Equivalent to calling `analyse` and `is_date` on each string, but computes features for blocks of strings at once
+    as matrices of code points. Non-ASCII strings, for which the Unicode semantics of `str.islower` and friends don't
+    reduce to simple character ranges, and very long strings, which would make blocks too wide, are analysed one at a
+    time.
+
+    Args:
+        pwds (Series of str): The strings to analyse.
+    Returns:
+        dict: Arrays of each field of `Features` and `is_date`, by name, one value per string.
+    """
+    pwds = pd.Series(pwds, dtype=object).reset_index(drop=True)
+    lengths = pwds.str.len().to_numpy(dtype=np.int64, copy=True)
+    # NumPy strings drop trailing null characters, so strings with any are analysed one at a time too.
+    simple = ~pwds.str.contains(r'[^\x01-\x7f]', regex=True).to_numpy(dtype=bool) & (lengths <= ANALYSE_MAX_WIDTH)
+    features = {field: np.zeros(len(pwds), dtype=bool if field.startswith('has_') else np.int64)
+        for field in Features._fields}
+    features['is_date'] = np.zeros(len(pwds), dtype=bool)
+
+    # Analyse simple strings a block at a time, each as wide as its longest string.
+    rows = np.flatnonzero(simple)
+    for start in range(0, len(rows), ANALYSE_BLOCK_SIZE):
+        block = rows[start:start + ANALYSE_BLOCK_SIZE]
+        width = max(1, lengths[block].max())
+        codes = np.array(pwds[block].tolist(), dtype=f'<U{width}').view(np.uint32).reshape(len(block), width)
+        for field, values in analyse_codes(codes, lengths[block]).items():
+            features[field][block] = values
+
+    # Only six-digit strings can be dates.
+    candidates = simple & pwds.str.fullmatch(r'[0-9]{6}').to_numpy(dtype=bool)
+    features['is_date'][candidates] = pwds[candidates].map(is_date).to_numpy(dtype=bool)
+
+    # Fall back to analysing other strings one at a time.
+    for i in np.flatnonzero(~simple):
+        for field, value in analyse(pwds[i])._asdict().items():
+            features[field][i] = value
+        features['is_date'][i] = is_date(pwds[i])
+    return features
+
+
+def dict_hits (pwds, dict):
+    """ Checks whether or not each of a series of strings is in a dictionary, after normalising (see `dict_normalise`).
+
+    Args:
+        pwds (Series of str): The strings to check.
+        dict (frozenset of str): The dictionary, as loaded by `load_dict`.
+    Returns:
+        ndarray of bool: True for each string that is in the dictionary, otherwise false.
+    """
+    pwds = pd.Series(pwds, dtype=object).reset_index(drop=True)
+    ascii = ~pwds.str.contains(r'[^\x00-\x7f]', regex=True).to_numpy(dtype=bool)
+    normalised = pwds.str.lower().str.replace(r'[^a-z]', '', regex=True)
+    normalised[~ascii] = pwds[~ascii].map(dict_normalise)
+    return normalised.map(dict.__contains__).to_numpy(dtype=bool)
@@ -0,0 +1,252 @@
+import sys
+import time
+import asyncio
+from asyncio.subprocess import PIPE
+
+import numpy as np
+
+from engine.authority import AuthorityError, backoff_delay, GL_BATCH_SIZE, AUTH_LAUNCH_RETRIES, AUTH_READY_TIMEOUT
+
+
+# The default number of passwords to keep in flight to the authority at once.
+ASYNC_WINDOW_SIZE = 1024
+
+# The edges, in seconds, of the logarithmic histogram bins latencies are counted in (from 100ns to 1000s).
+LATENCY_BIN_EDGES = np.logspace(-7, 3, 201)
+
+
+class AsyncAuthority:
+    """ Represents a running Skeptic Authority process for a single policy, driven by an asyncio event loop so that
+    passwords are written to the authority while verdicts are read back.
+
+    At most a window of passwords are in flight at once, so neither side can run too far ahead of the other. Exposes
+    the same interface as `Authority`, so either can be used for filtration.
+    """
+
+    def __init__ (self, file, policy, window=ASYNC_WINDOW_SIZE, ready_timeout=AUTH_READY_TIMEOUT):
+        """ Constructs a new (not yet launched) authority.
+
+        Args:
+            file (str): The binary file to execute.
+            policy (str): The name of the policy to call the file with.
+            window (int): The most passwords to have sent to the authority without reading back their verdicts.
+            ready_timeout (float): The number of seconds to wait for the authority to report that it's ready.
+        """
+        if window < 1:
+            raise ValueError(f'Window must be at least 1 password, got {window}.')
+        self.file = file
+        self.policy = policy
+        self.window = window
+        self.ready_timeout = ready_timeout
+        self.loop = None
+        self.proc = None
+        self.asked = 0 # Passwords asked since launch, the authority exits after `GL_BATCH_SIZE` of them.
+        self.launch_times = [] # Seconds taken by each successful launch, up to the ready handshake.
+        # Seconds between sending each password and reading back its verdict, as a histogram so memory stays bounded.
+        self.latency_counts = np.zeros(len(LATENCY_BIN_EDGES) + 1, dtype=np.int64)
+        self.latency_total = 0.0
+        self.busy = 0.0 # Seconds spent checking passwords, excluding launches.
+
+    def run (self, coro):
+        """ Runs a coroutine to completion on this authority's event loop, creating the loop if necessary.
+
+        Args:
+            coro (coroutine): The coroutine to run.
+        Returns:
+            object: The coroutine's result.
+        """
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+        return self.loop.run_until_complete(coro)
+
+    def try_launch (self):
+        """ Attempts to launch the authority process, backing off between failed attempts.
+
+        Returns:
+            bool: True if the authority launched successfully, otherwise false.
+        """
+        return self.run(self.launch())
+
+    async def launch (self):
+        """ Attempts to launch the authority process, backing off between failed attempts.
+
+        Returns:
+            bool: True if the authority launched successfully, otherwise false.
+        """
+        retries = 0
+        while retries <= AUTH_LAUNCH_RETRIES: # We might need to retry this several times.
+            if retries > 0:
+                print(f'Authority launch failed, retrying (attempt {retries} of {AUTH_LAUNCH_RETRIES})...', file=sys.stderr)
+                await asyncio.sleep(backoff_delay(retries))
+            try:
+                start = time.monotonic()
+                self.proc = await asyncio.create_subprocess_exec(self.file, self.policy, str(GL_BATCH_SIZE),
+                    stdin=PIPE, stdout=PIPE)
+                self.asked = 0
+                # Wait for state to come back from launched authority.
+                if await self.await_ready():
+                    self.launch_times.append(time.monotonic() - start)
+                    return True
+                await self.kill() # Exited, timed out or said something unexpected.
+            except OSError:
+                pass # Couldn't execute the binary at all.
+            retries += 1
+        return False
+
+    async def await_ready (self):
+        """ Waits until the authority reports that it's ready, it exits, or the ready timeout expires.
+
+        Returns:
+            bool: True if the authority reported that it's ready, otherwise false.
+        """
+        try:
+            buffer = await asyncio.wait_for(self.proc.stdout.readline(), self.ready_timeout)
+        except asyncio.TimeoutError:
+            print(f'Authority for policy \'{self.policy}\' not ready after {self.ready_timeout}s.', file=sys.stderr)
+            return False
+        return buffer.decode().strip().lower() == 'ready' # Empty if it exited, probably because parameters are incorrect.
+
+    def ask (self, pwd):
+        """ Checks with the authority whether or not a password is permitted.
+
+        Args:
+            pwd (str): The password to check.
+        Returns:
+            bool: True if the password is permitted, otherwise False.
+        """
+        return self.ask_many([pwd])[0]
+
+    def ask_many (self, pwds):
+        """ Checks with the authority whether or not each of a list of passwords is permitted.
+
+        Args:
+            pwds (list of str): The passwords to check.
+        Returns:
+            list of bool: True for each password that is permitted, otherwise False.
+        """
+        return self.run(self.pipeline(pwds))
+
+    async def pipeline (self, pwds):
+        """ Checks each of a list of passwords with the authority, relaunching it as it exits or dies.
+
+        Args:
+            pwds (list of str): The passwords to check.
+        Returns:
+            list of bool: True for each password that is permitted, otherwise False.
+        """
+        verdicts = []
+        while len(verdicts) < len(pwds):
+            if self.asked >= GL_BATCH_SIZE:
+                await self.kill() # Authority won't answer any more, it should be exiting anyway.
+            if (self.proc is None or self.proc.returncode is not None) and not await self.launch():
+                raise AuthorityError(f'Authority launch failed completely for policy \'{self.policy}\'.')
+            # Never ask for more than the authority will answer before it exits.
+            start = time.perf_counter()
+            answered = await self.ask_window(pwds[len(verdicts):len(verdicts) + GL_BATCH_SIZE - self.asked])
+            self.busy += time.perf_counter() - start
+            if not answered:
+                raise AuthorityError(f'Authority for policy \'{self.policy}\' died without answering.')
+            verdicts += answered
+        return verdicts
+
+    async def ask_window (self, block):
+        """ Streams a block of passwords through the authority, keeping at most a window of them in flight.
+
+        If the authority dies part way through the block, only the verdicts read so far are returned, and passwords
+        in flight are asked again of the relaunched authority.
+
+        Args:
+            block (list of str): The passwords to check.
+        Returns:
+            list of bool: True for each password that is permitted, otherwise False.
+        """
+        proc = self.proc
+        slots = asyncio.Semaphore(self.window)
+        sent = [] # The time at which each password was sent.
+        latencies = [] # Seconds taken to answer each password, counted into the histogram once the block is done.
+        async def write ():
+            try:
+                for pwd in block:
+                    await slots.acquire()
+                    sent.append(time.perf_counter())
+                    proc.stdin.write(f'{pwd}\n'.encode())
+                    await proc.stdin.drain()
+            except OSError:
+                pass # Authority died, this is detected by the reader.
+        writer = asyncio.ensure_future(write())
+        verdicts = []
+        try:
+            for i in range(len(block)):
+                buffer = await proc.stdout.readline()
+                if not buffer:
+                    break # Authority died, it will be relaunched for the rest of the block.
+                latencies.append(time.perf_counter() - sent[i])
+                verdicts.append(buffer.decode().strip().lower() == 'true')
+                slots.release()
+        finally:
+            writer.cancel()
+            await asyncio.gather(writer, return_exceptions=True)
+            self.count_latencies(latencies)
+        self.asked += len(verdicts)
+        if len(verdicts) < len(block):
+            await self.kill()
+        return verdicts
+
+    def count_latencies (self, latencies):
+        """ Counts latencies into the histogram.
+
+        Args:
+            latencies (list of float): The latencies, in seconds.
+        """
+        latencies = np.asarray(latencies, dtype=float)
+        self.latency_counts += np.bincount(np.searchsorted(LATENCY_BIN_EDGES, latencies),
+            minlength=len(self.latency_counts))
+        self.latency_total += latencies.sum()
+
+    def latency_quantile (self, q):
+        """ Estimates a quantile of latency from the histogram, as the upper edge of the bin it falls in.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+        Returns:
+            float: The latency, in seconds (accurate to the bin width, about 12%).
+        """
+        index = np.searchsorted(np.cumsum(self.latency_counts), q * self.latency_counts.sum())
+        return float(LATENCY_BIN_EDGES[min(index, len(LATENCY_BIN_EDGES) - 1)])
+
+    def stats (self):
+        """ Summarises how quickly the authority has answered, for tuning the window size.
+
+        Returns:
+            dict: The number of passwords answered, throughput in passwords per second, and mean, median and 99th
+                percentile latency in seconds.
+        """
+        answered = int(self.latency_counts.sum())
+        if answered == 0:
+            return {'answered': 0, 'throughput': 0.0, 'mean': 0.0, 'median': 0.0, 'p99': 0.0}
+        return {
+            'answered': answered,
+            'throughput': answered / self.busy if self.busy > 0 else float('inf'),
+            'mean': self.latency_total / answered,
+            'median': self.latency_quantile(0.5),
+            'p99': self.latency_quantile(0.99),
+        }
+
+    async def kill (self):
+        """ Gets rid of the authority process, if one is running.
+        """
+        if self.proc is not None:
+            try:
+                self.proc.kill()
+            except ProcessLookupError:
+                pass # Already exited.
+            await self.proc.wait()
+            self.proc = None
+
+    def terminate (self):
+        """ Gets rid of the authority process, if one is running, and closes the event loop.
+        """
+        if self.loop is not None:
+            self.run(self.kill())
+            self.loop.close()
+            self.loop = None
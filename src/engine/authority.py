@@ -0,0 +1,197 @@
+import sys
+import os
+import time
+import select
+import threading
+from subprocess import Popen, PIPE
+
+
+# The total number of passwords the authority will ask for. Setting this too high will cause a stack overflow!
+GL_BATCH_SIZE = 20000
+
+# The total number of times to attempt to launch the authority.
+AUTH_LAUNCH_RETRIES = 5
+
+# The number of seconds to wait for a launched authority to report that it's ready.
+AUTH_READY_TIMEOUT = 30
+
+# The number of seconds to wait before the first retry, doubling with each retry after that.
+AUTH_BACKOFF_BASE = 0.1
+
+# The maximum number of seconds to wait between retries.
+AUTH_BACKOFF_MAX = 5
+
+
+def backoff_delay (retries):
+    """ Computes how long to wait before retrying, using capped exponential backoff.
+
+    Args:
+        retries (int): The number of attempts that have failed so far (at least 1).
+    Returns:
+        float: The number of seconds to wait.
+    """
+    return min(AUTH_BACKOFF_MAX, AUTH_BACKOFF_BASE * 2 ** (retries - 1))
+
+
+class AuthorityError(Exception):
+    """ Raised when an authority cannot be launched or stops responding.
+    """
+    pass
+
+
+class Authority:
+    """ Represents a running Skeptic Authority process for a single policy.
+    """
+
+    def __init__ (self, file, policy, batched=True, ready_timeout=AUTH_READY_TIMEOUT):
+        """ Constructs a new (not yet launched) authority.
+
+        Args:
+            file (str): The binary file to execute.
+            policy (str): The name of the policy to call the file with.
+            batched (bool): Whether to pipeline blocks of passwords, or fall back to one round trip per password.
+            ready_timeout (float): The number of seconds to wait for the authority to report that it's ready.
+        """
+        self.file = file
+        self.policy = policy
+        self.batched = batched
+        self.ready_timeout = ready_timeout
+        self.proc = None
+        self.asked = 0 # Passwords asked since launch, the authority exits after `GL_BATCH_SIZE` of them.
+        self.launch_times = [] # Seconds taken by each successful launch, up to the ready handshake.
+
+    def try_launch (self):
+        """ Attempts to launch the authority process, backing off between failed attempts.
+
+        Returns:
+            bool: True if the authority launched successfully, otherwise false.
+        """
+        retries = 0
+        while retries <= AUTH_LAUNCH_RETRIES: # We might need to retry this several times.
+            if retries > 0:
+                print(f'Authority launch failed, retrying (attempt {retries} of {AUTH_LAUNCH_RETRIES})...', file=sys.stderr)
+                time.sleep(backoff_delay(retries))
+            try:
+                start = time.monotonic()
+                self.proc = Popen([self.file, self.policy, str(GL_BATCH_SIZE)], stdin=PIPE, stdout=PIPE)
+                self.asked = 0
+                # Wait for state to come back from launched authority.
+                if self.await_ready():
+                    self.launch_times.append(time.monotonic() - start)
+                    return True
+                self.terminate() # Exited, timed out or said something unexpected.
+            except OSError:
+                pass # Couldn't execute the binary at all.
+            retries += 1
+        return False
+
+    def await_ready (self):
+        """ Blocks until the authority reports that it's ready, it exits, or the ready timeout expires.
+
+        The handshake is read a byte at a time, so nothing after it is consumed from the pipe.
+
+        Returns:
+            bool: True if the authority reported that it's ready, otherwise false.
+        """
+        deadline = time.monotonic() + self.ready_timeout
+        fd = self.proc.stdout.fileno()
+        buffer = b''
+        while not buffer.endswith(b'\n'):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                print(f'Authority for policy \'{self.policy}\' not ready after {self.ready_timeout}s.', file=sys.stderr)
+                return False
+            byte = os.read(fd, 1)
+            if not byte:
+                return False # Exited, probably because parameters are incorrect.
+            buffer += byte
+        return buffer.decode().strip().lower() == 'ready'
+
+    def ask (self, pwd):
+        """ Checks with the authority whether or not a password is permitted.
+
+        Args:
+            pwd (str): The password to check.
+        Returns:
+            bool: True if the password is permitted, otherwise False.
+        """
+        self.ensure_running()
+        # Pass password into authority (don't forget to flush).
+        self.proc.stdin.write(f'{pwd}\n'.encode())
+        self.proc.stdin.flush()
+        self.asked += 1
+        # Return result, cast to boolean.
+        buffer = self.proc.stdout.readline()
+        return buffer.decode().strip().lower() == 'true'
+
+    def ask_many (self, pwds):
+        """ Checks with the authority whether or not each of a list of passwords is permitted.
+
+        In batched mode, passwords are written in blocks of up to `GL_BATCH_SIZE` while verdicts are read back
+        concurrently, so there is no round trip per password. Otherwise, each password is asked in turn.
+
+        Args:
+            pwds (list of str): The passwords to check.
+        Returns:
+            list of bool: True for each password that is permitted, otherwise False.
+        """
+        if not self.batched:
+            return [self.ask(pwd) for pwd in pwds]
+        verdicts = []
+        while len(verdicts) < len(pwds):
+            self.ensure_running()
+            # Never ask for more than the authority will answer before it exits.
+            block = pwds[len(verdicts):len(verdicts) + GL_BATCH_SIZE - self.asked]
+            answered = self.ask_block(block)
+            if not answered:
+                raise AuthorityError(f'Authority for policy \'{self.policy}\' died without answering.')
+            verdicts += answered
+        return verdicts
+
+    def ask_block (self, block):
+        """ Pipelines a block of passwords through the authority.
+
+        Passwords are written from a separate thread so that neither side can block on a full pipe. If the
+        authority dies part way through the block, only the verdicts read so far are returned.
+
+        Args:
+            block (list of str): The passwords to check.
+        Returns:
+            list of bool: True for each password that is permitted, otherwise False.
+        """
+        proc = self.proc
+        def write ():
+            try:
+                proc.stdin.write(''.join(f'{pwd}\n' for pwd in block).encode())
+                proc.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass # Authority died, this is detected by the reader.
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        verdicts = []
+        for i in range(len(block)):
+            buffer = proc.stdout.readline()
+            if not buffer:
+                break # Authority died, it will be relaunched for the rest of the block.
+            verdicts.append(buffer.decode().strip().lower() == 'true')
+        writer.join()
+        self.asked += len(verdicts)
+        if len(verdicts) < len(block):
+            proc.kill()
+        return verdicts
+
+    def ensure_running (self):
+        """ Relaunches the authority if it has exited or used up its batch.
+        """
+        if self.asked >= GL_BATCH_SIZE:
+            self.terminate() # Authority won't answer any more, it should be exiting anyway.
+        if (self.proc is None or self.proc.poll() != None) and not self.try_launch():
+            raise AuthorityError(f'Authority launch failed completely for policy \'{self.policy}\'.')
+
+    def terminate (self):
+        """ Gets rid of the authority process, if one is running.
+        """
+        if self.proc is not None:
+            self.proc.terminate()
+            self.proc.wait()
+            self.proc = None
@@ -0,0 +1,108 @@
+import sys
+import queue
+import threading
+
+from engine.authority import Authority, AuthorityError, GL_BATCH_SIZE, AUTH_READY_TIMEOUT
+
+
+class AuthorityPool:
+    """ Represents a pool of Skeptic Authority processes for a single policy, checking passwords concurrently.
+
+    Exposes the same interface as `Authority`, so either can be used for filtration.
+    """
+
+    def __init__ (self, file, policy, workers, batched=True, ready_timeout=AUTH_READY_TIMEOUT):
+        """ Constructs a new (not yet launched) pool of authorities.
+
+        Args:
+            file (str): The binary file to execute.
+            policy (str): The name of the policy to call the file with.
+            workers (int): The number of authority processes to run.
+            batched (bool): Whether to pipeline blocks of passwords, or fall back to one round trip per password.
+            ready_timeout (float): The number of seconds to wait for each authority to report that it's ready.
+        """
+        self.file = file
+        self.policy = policy
+        self.workers = [Authority(file, policy, batched, ready_timeout) for i in range(workers)]
+
+    @property
+    def launch_times (self):
+        """ Gets the seconds taken by each successful launch of any authority in the pool.
+
+        Returns:
+            list of float: The launch times.
+        """
+        return [time for worker in self.workers for time in worker.launch_times]
+
+    def try_launch (self):
+        """ Attempts to launch every authority process in the pool concurrently.
+
+        Returns:
+            bool: True if at least one authority launched successfully, otherwise false.
+        """
+        launched = [False] * len(self.workers)
+        def launch (i):
+            launched[i] = self.workers[i].try_launch()
+        threads = [threading.Thread(target=launch, args=(i,)) for i in range(len(self.workers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return any(launched)
+
+    def ask (self, pwd):
+        """ Checks with the authority whether or not a password is permitted.
+
+        Args:
+            pwd (str): The password to check.
+        Returns:
+            bool: True if the password is permitted, otherwise False.
+        """
+        return self.ask_many([pwd])[0]
+
+    def ask_many (self, pwds):
+        """ Checks with the authorities whether or not each of a list of passwords is permitted.
+
+        Passwords are split into shards of up to `GL_BATCH_SIZE`, which idle workers take in turn. If a worker's
+        authority can't be relaunched, its shard is handed back to the remaining workers.
+
+        Args:
+            pwds (list of str): The passwords to check.
+        Returns:
+            list of bool: True for each password that is permitted, otherwise False, in the original order.
+        """
+        starts = range(0, len(pwds), GL_BATCH_SIZE)
+        shards = queue.Queue()
+        for i, start in enumerate(starts):
+            shards.put((i, pwds[start:start + GL_BATCH_SIZE]))
+        results = [None] * len(starts)
+        alive = [True] * len(self.workers)
+        def work (w):
+            while True:
+                try:
+                    i, shard = shards.get_nowait()
+                except queue.Empty:
+                    return # Nothing left to check.
+                try:
+                    results[i] = self.workers[w].ask_many(shard)
+                except AuthorityError as err:
+                    print(f'Authority worker {w} failed ({err}), handing its shard back...', file=sys.stderr)
+                    alive[w] = False
+                    shards.put((i, shard))
+                    return
+        while not shards.empty() and any(alive): # Shards handed back late may need another round.
+            threads = [threading.Thread(target=work, args=(w,)) for w in range(len(self.workers)) if alive[w]]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        if not shards.empty():
+            raise AuthorityError(f'Every authority worker for policy \'{self.policy}\' failed.')
+        # Put verdicts back together in the original order.
+        return [verdict for shard in results for verdict in shard]
+
+    def terminate (self):
+        """ Gets rid of every authority process in the pool.
+        """
+        for worker in self.workers:
+            worker.terminate()
@@ -0,0 +1,141 @@
+import numpy as np
+
+
+# The optional column giving the number of passwords a row stands for, all with that row's probability.
+COUNT_COLUMN = 'count'
+
+
+def has_blocks (df):
+    """ Checks whether or not a data frame contains run-length blocks (rows standing for more than one password).
+
+    Args:
+        df (DataFrame): The data frame to check.
+    Returns:
+        bool: True if the data frame has a count column, otherwise false.
+    """
+    return COUNT_COLUMN in df.columns
+
+
+def entry_counts (df):
+    """ Gets the number of passwords each row of a data frame stands for.
+
+    Rows without a count stand for a single password.
+
+    Args:
+        df (DataFrame): The data frame.
+    Returns:
+        ndarray of int: The number of passwords for each row.
+    """
+    if not has_blocks(df):
+        return np.ones(len(df.index), dtype=np.int64)
+    return df[COUNT_COLUMN].fillna(1).to_numpy(dtype=np.int64)
+
+
+def total_entries (df):
+    """ Gets the number of passwords a data frame stands for.
+
+    Args:
+        df (DataFrame): The data frame.
+    Returns:
+        int: The number of passwords.
+    """
+    return int(entry_counts(df).sum())
+
+
+def block_bounds (df):
+    """ Computes where each row of a data frame, sorted by probability, begins in the list of passwords it stands for.
+
+    Args:
+        df (DataFrame): The data frame, sorted by probability.
+    Returns:
+        tuple: The probability, count, number of passwords before and probability mass before each row, and the sum of
+            i * p_i over the passwords before each row, as arrays.
+    """
+    probs = df['probability'].to_numpy(dtype=float)
+    counts = entry_counts(df)
+    starts = np.cumsum(counts) - counts
+    mass = np.concatenate(([0.0], np.cumsum(probs * counts)))[:-1]
+    # Ranks within a row run from start + 1 to start + count, so they sum to count * start + count * (count + 1) / 2.
+    weights = probs * (counts * starts + counts * (counts + 1) / 2)
+    weighted = np.concatenate(([0.0], np.cumsum(weights)))[:-1]
+    return probs, counts, starts, mass, weighted
+
+
+def find_blocks (df, guesses):
+    """ Finds the row each number of guesses ends in, with the number of guesses made within that row.
+
+    Args:
+        df (DataFrame): The data frame, sorted by probability.
+        guesses (ndarray of int): The numbers of guesses, each between 0 and the number of passwords.
+    Returns:
+        tuple: The bounds of each row (see `block_bounds`), followed by the row and the guesses within it for each
+            number of guesses.
+    """
+    bounds = block_bounds(df)
+    probs, counts, starts, _, _ = bounds
+    guesses = np.asarray(guesses, dtype=np.int64)
+    rows = np.clip(np.searchsorted(starts + counts, guesses, side='left'), 0, max(0, len(probs) - 1))
+    return bounds + (rows, guesses - starts[rows])
+
+
+def cumulative_at (df, guesses):
+    """ Computes the cumulative probability of an optimal guessing attack after each of a number of guesses.
+
+    Args:
+        df (DataFrame): The data frame to guess against, sorted by probability.
+        guesses (ndarray of int): The numbers of guesses, each between 0 and the number of passwords.
+    Returns:
+        ndarray of float: The cumulative probability after each number of guesses.
+    """
+    if len(df.index) == 0:
+        return np.zeros(len(guesses))
+    probs, _, _, mass, _, rows, within = find_blocks(df, guesses)
+    return mass[rows] + within * probs[rows]
+
+
+def weighted_at (df, guesses):
+    """ Computes the partial sum of i * p_i up to each of a number of guesses.
+
+    Args:
+        df (DataFrame): The data frame to guess against, sorted by probability.
+        guesses (ndarray of int): The numbers of guesses, each between 0 and the number of passwords.
+    Returns:
+        ndarray of float: The partial sum for each number of guesses.
+    """
+    if len(df.index) == 0:
+        return np.zeros(len(guesses))
+    probs, _, starts, _, weighted, rows, within = find_blocks(df, guesses)
+    return weighted[rows] + probs[rows] * (within * starts[rows] + within * (within + 1) / 2)
+
+
+def probability_at (df, positions):
+    """ Gets the probability of the password at each of a number of positions in the list of passwords.
+
+    Args:
+        df (DataFrame): The data frame, sorted by probability.
+        positions (ndarray of int): The positions, each between 0 and one less than the number of passwords.
+    Returns:
+        ndarray of float: The probability at each position.
+    """
+    probs = df['probability'].to_numpy(dtype=float)
+    ends = np.cumsum(entry_counts(df))
+    return probs[np.searchsorted(ends, np.asarray(positions, dtype=np.int64), side='right')]
+
+
+def guesses_to_reach (df, alpha):
+    """ Finds the fewest guesses with which an optimal guessing attack succeeds with at least a given probability.
+
+    Args:
+        df (DataFrame): The data frame to guess against, sorted by probability.
+        alpha (float): The target success rate.
+    Returns:
+        int: The number of guesses, or none if the target is never reached.
+    """
+    probs, counts, starts, mass, _ = block_bounds(df)
+    row = int(np.searchsorted(mass + probs * counts, alpha, side='left'))
+    if row >= len(probs):
+        return None
+    # Within the row, every guess adds the same probability.
+    needed = alpha - mass[row]
+    within = 0 if needed <= 0 or probs[row] <= 0 else min(int(counts[row]), int(np.ceil(needed / probs[row])))
+    return int(starts[row] + within)
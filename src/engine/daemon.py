@@ -0,0 +1,347 @@
+import sys
+import os
+import time
+import stat
+import fcntl
+import socket
+import hashlib
+import tempfile
+import threading
+import socketserver
+from subprocess import Popen, DEVNULL
+
+from engine.authority import Authority, AuthorityError, AUTH_READY_TIMEOUT, AUTH_LAUNCH_RETRIES, GL_BATCH_SIZE
+from engine.authpool import AuthorityPool
+
+
+# The script that runs an authority daemon (see `authd.py`).
+AUTHD_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'authd.py')
+
+# The number of seconds a daemon waits without any clients before exiting.
+DAEMON_IDLE_TIMEOUT = 60
+
+# The number of seconds to wait between attempts to connect to a daemon that's starting up.
+DAEMON_CONNECT_INTERVAL = 0.05
+
+# The most passwords a client sends in one request, so neither side holds too many at once.
+DAEMON_REQUEST_SIZE = GL_BATCH_SIZE
+
+
+def daemon_dir ():
+    """ Gets the directory daemon sockets are kept in, creating it if necessary.
+
+    Sockets are kept in a directory only the current user can use, so that no one else can stand in for a daemon. This
+    is under `$XDG_RUNTIME_DIR` if it's set, otherwise in the temporary directory, as socket paths must be short.
+
+    Returns:
+        str: The directory path.
+    Raises:
+        OSError: If the directory can't be created, or exists but isn't private to the current user.
+    """
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime and os.path.isdir(runtime):
+        path = os.path.join(runtime, 'pyrrho')
+    else:
+        path = os.path.join(tempfile.gettempdir(), f'pyrrho-{os.getuid()}')
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass # Made by an earlier client or daemon, checked below.
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise OSError(f'Daemon directory \'{path}\' is not a directory private to this user.')
+    return path
+
+
+def daemon_socket_path (file, policy):
+    """ Computes the socket a daemon for an authority binary and policy listens on.
+
+    Args:
+        file (str): The path of the authority binary.
+        policy (str): The name of the policy.
+    Returns:
+        str: The socket path (see `daemon_dir`).
+    Raises:
+        OSError: If the directory sockets are kept in can't be used.
+    """
+    key = hashlib.sha256(f'{os.path.abspath(file)}\n{policy}'.encode()).hexdigest()[:16]
+    return os.path.join(daemon_dir(), f'authd-{key}.sock')
+
+
+class DaemonRequestHandler (socketserver.StreamRequestHandler):
+    """ Answers requests from one client of an authority daemon.
+
+    Each request is a line giving a number of passwords, followed by that many passwords a line each. The reply is a
+    line of 'true' or 'false' for each, or a single line starting with 'error' if the authority failed completely.
+    """
+
+    def handle (self):
+        """ Answers requests until the client disconnects.
+        """
+        self.server.connected(1)
+        try:
+            while True:
+                header = self.rfile.readline()
+                if not header:
+                    return # Client disconnected.
+                pwds = [self.rfile.readline().decode('utf-8').rstrip('\n') for i in range(int(header))]
+                try:
+                    # Requests from every client share the same authority, one at a time.
+                    with self.server.lock:
+                        verdicts = self.server.authority.ask_many(pwds)
+                    reply = ''.join('true\n' if verdict else 'false\n' for verdict in verdicts)
+                except AuthorityError as err:
+                    reply = f'error {err}\n'
+                self.wfile.write(reply.encode('utf-8'))
+                self.wfile.flush()
+        except (OSError, ValueError):
+            pass # Client went away or sent something malformed.
+        finally:
+            self.server.connected(-1)
+
+
+class AuthorityDaemon (socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ Represents a daemon serving one authority (or pool of them) to any number of clients over a Unix domain socket.
+
+    The authority is relaunched as needed, so that clients never see it exit. The daemon exits once it has had no
+    clients for a while.
+    """
+
+    daemon_threads = True
+
+    def __init__ (self, path, authority, idle_timeout=DAEMON_IDLE_TIMEOUT):
+        """ Constructs a new authority daemon, listening on a socket.
+
+        Args:
+            path (str): The socket path to listen on.
+            authority (Authority): The authority (or pool of them) to serve, already launched.
+            idle_timeout (float): The number of seconds to wait without any clients before exiting.
+        """
+        self.authority = authority
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.clients = 0
+        self.last_active = time.monotonic()
+        self.clients_lock = threading.Lock()
+        if os.path.exists(path):
+            os.remove(path) # Left behind by a daemon that didn't exit cleanly.
+        super().__init__(path, DaemonRequestHandler)
+
+    def connected (self, change):
+        """ Records a client connecting or disconnecting.
+
+        Args:
+            change (int): 1 if a client connected, -1 if one disconnected.
+        """
+        with self.clients_lock:
+            self.clients += change
+            self.last_active = time.monotonic()
+
+    def watch_idle (self):
+        """ Shuts the daemon down once it has had no clients for the idle timeout.
+        """
+        while True:
+            time.sleep(min(1, self.idle_timeout))
+            with self.clients_lock:
+                idle = self.clients == 0 and time.monotonic() - self.last_active >= self.idle_timeout
+            if idle:
+                self.shutdown()
+                return
+
+
+def serve (file, policy, path=None, workers=None, idle_timeout=DAEMON_IDLE_TIMEOUT, ready_timeout=AUTH_READY_TIMEOUT):
+    """ Runs an authority daemon until it has had no clients for a while.
+
+    Only one daemon runs per socket, later ones exit straight away.
+
+    Args:
+        file (str): The path of the authority binary.
+        policy (str): The name of the policy.
+        path (str): The socket path to listen on (see `daemon_socket_path` if not given).
+        workers (int): The number of authority processes to run (one if not given).
+        idle_timeout (float): The number of seconds to wait without any clients before exiting.
+        ready_timeout (float): The number of seconds to wait for the authority to report that it's ready.
+    Returns:
+        bool: True if the daemon ran, or false if another was already running or the authority failed to launch.
+    """
+    path = daemon_socket_path(file, policy) if path is None else path
+    with open(path + '.lock', 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False # Another daemon owns this socket.
+        try:
+            if os.fstat(lock.fileno()).st_ino != os.stat(path + '.lock').st_ino:
+                return False # Removed by a daemon shutting down, a newer daemon may have its own.
+        except FileNotFoundError:
+            return False
+        try:
+            return run_daemon(file, policy, path, workers, idle_timeout, ready_timeout)
+        finally:
+            os.remove(path + '.lock') # Removed while still locked, so no other daemon can take it over.
+
+
+def run_daemon (file, policy, path, workers, idle_timeout, ready_timeout):
+    """ Launches an authority and serves it until it has had no clients for a while, holding the lock for the socket.
+
+    Args:
+        file (str): The path of the authority binary.
+        policy (str): The name of the policy.
+        path (str): The socket path to listen on.
+        workers (int): The number of authority processes to run (one if not given).
+        idle_timeout (float): The number of seconds to wait without any clients before exiting.
+        ready_timeout (float): The number of seconds to wait for the authority to report that it's ready.
+    Returns:
+        bool: True if the daemon ran, or false if the authority failed to launch.
+    """
+    if workers is None:
+        authority = Authority(file, policy, True, ready_timeout)
+    else:
+        authority = AuthorityPool(file, policy, workers, True, ready_timeout)
+    if not authority.try_launch():
+        return False
+    daemon = AuthorityDaemon(path, authority, idle_timeout)
+    try:
+        threading.Thread(target=daemon.watch_idle, daemon=True).start()
+        daemon.serve_forever()
+    finally:
+        daemon.server_close()
+        authority.terminate()
+        os.remove(path)
+    return True
+
+
+class DaemonAuthority:
+    """ Represents a client of an authority daemon, starting the daemon if it isn't already running.
+
+    Exposes the same interface as `Authority`, so either can be used for filtration.
+    """
+
+    def __init__ (self, file, policy, workers=None, ready_timeout=AUTH_READY_TIMEOUT):
+        """ Constructs a new (not yet connected) authority daemon client.
+
+        Args:
+            file (str): The path of the authority binary.
+            policy (str): The name of the policy.
+            workers (int): The number of authority processes the daemon should run, if it has to be started.
+            ready_timeout (float): The number of seconds to wait for the daemon to start.
+        """
+        self.file = os.path.abspath(file)
+        self.policy = policy
+        self.workers = workers
+        self.ready_timeout = ready_timeout
+        self.path = None # Found on first connection.
+        self.sock = None
+        self.launch_times = [] # Seconds taken by each successful connection, including starting the daemon.
+
+    def connect (self):
+        """ Attempts to connect to the daemon once.
+
+        Returns:
+            bool: True if connected, otherwise false.
+        """
+        try:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(self.path)
+            self.reader = self.sock.makefile('rb')
+            self.writer = self.sock.makefile('wb')
+            return True
+        except OSError:
+            self.sock.close()
+            self.sock = None
+            return False
+
+    def try_launch (self):
+        """ Connects to the daemon, starting it first if it isn't running.
+
+        Returns:
+            bool: True if connected, otherwise false.
+        """
+        start = time.monotonic()
+        try:
+            self.path = daemon_socket_path(self.file, self.policy) if self.path is None else self.path
+        except OSError as err:
+            print(f'Can\'t use authority daemon ({err}).', file=sys.stderr)
+            return False
+        if not self.connect():
+            args = [sys.executable, AUTHD_SCRIPT, '-a', self.file, '-p', self.policy, '-socket', self.path]
+            if self.workers is not None:
+                args += ['-j', str(self.workers)]
+            # The daemon outlives this process, so detach it.
+            Popen(args, cwd=os.path.dirname(AUTHD_SCRIPT), stdin=DEVNULL, stdout=DEVNULL, stderr=DEVNULL, start_new_session=True)
+            deadline = start + self.ready_timeout
+            while not self.connect():
+                if time.monotonic() > deadline:
+                    print(f'Authority daemon for policy \'{self.policy}\' not ready after {self.ready_timeout}s.', file=sys.stderr)
+                    return False
+                time.sleep(DAEMON_CONNECT_INTERVAL)
+        self.launch_times.append(time.monotonic() - start)
+        return True
+
+    def ask (self, pwd):
+        """ Checks with the daemon whether or not a password is permitted.
+
+        Args:
+            pwd (str): The password to check.
+        Returns:
+            bool: True if the password is permitted, otherwise False.
+        """
+        return self.ask_many([pwd])[0]
+
+    def ask_many (self, pwds):
+        """ Checks with the daemon whether or not each of a list of passwords is permitted.
+
+        If the daemon goes away, it's restarted and the request is sent again.
+
+        Args:
+            pwds (list of str): The passwords to check.
+        Returns:
+            list of bool: True for each password that is permitted, otherwise False.
+        """
+        verdicts = []
+        retries = 0
+        while len(verdicts) < len(pwds):
+            request = pwds[len(verdicts):len(verdicts) + DAEMON_REQUEST_SIZE]
+            try:
+                if self.sock is None and not self.try_launch():
+                    raise AuthorityError(f'Authority daemon could not be started for policy \'{self.policy}\'.')
+                verdicts += self.ask_request(request)
+            except (OSError, EOFError):
+                self.terminate()
+                retries += 1
+                if retries > AUTH_LAUNCH_RETRIES:
+                    raise AuthorityError(f'Authority daemon for policy \'{self.policy}\' keeps going away.')
+        return verdicts
+
+    def ask_request (self, request):
+        """ Sends one request to the daemon and reads back the reply.
+
+        Args:
+            request (list of str): The passwords to check.
+        Returns:
+            list of bool: True for each password that is permitted, otherwise False.
+        """
+        self.writer.write(f'{len(request)}\n'.encode('utf-8'))
+        self.writer.write(''.join(f'{pwd}\n' for pwd in request).encode('utf-8'))
+        self.writer.flush()
+        verdicts = []
+        for i in range(len(request)):
+            buffer = self.reader.readline()
+            if not buffer:
+                raise EOFError('Authority daemon closed the connection.')
+            answer = buffer.decode('utf-8').strip()
+            if answer.startswith('error'):
+                raise AuthorityError(answer[len('error'):].strip())
+            verdicts.append(answer.lower() == 'true')
+        return verdicts
+
+    def terminate (self):
+        """ Disconnects from the daemon, which carries on running for other clients.
+        """
+        if self.sock is not None:
+            for stream in [self.reader, self.writer, self.sock]:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+            self.sock = None
@@ -0,0 +1,172 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+# The name of the directory, next to each input file, in which cached copies are kept.
+CACHE_DIR_NAME = '.pyrrho'
+
+# Bump this whenever the cache layout changes, so old caches are rebuilt rather than misread.
+CACHE_FORMAT_VERSION = 1
+
+# The number of bytes to read at a time when hashing input files.
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_file (file):
+    """ Computes the SHA-256 hash of a file's contents.
+
+    Args:
+        file (str): The path of the file.
+    Returns:
+        str: The hex digest of the hash.
+    """
+    digest = hashlib.sha256()
+    with open(file, 'rb') as target:
+        for block in iter(lambda: target.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path (file, encoding=None):
+    """ Computes the directory in which the cached copy of a file is kept.
+
+    Args:
+        file (str): The path of the input file.
+        encoding (str): The encoding the file is read with.
+    Returns:
+        str: The cache directory path.
+    """
+    dir, name = os.path.split(os.path.abspath(file))
+    return os.path.join(dir, CACHE_DIR_NAME, f'{name}.{encoding or "default"}')
+
+
+def read_meta (path):
+    """ Reads the metadata of a cached copy, if there is one.
+
+    Args:
+        path (str): The cache directory path.
+    Returns:
+        dict: The metadata, or none if there is no (readable) cached copy.
+    """
+    try:
+        with open(os.path.join(path, 'meta.json')) as target:
+            meta = json.load(target)
+        return meta if meta.get('version') == CACHE_FORMAT_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+
+def lookup (file, encoding=None):
+    """ Finds an up-to-date cached copy of a file.
+
+    A cached copy is up to date if the file's size and modification time are unchanged, or failing that, if its
+    contents still hash the same (in which case the recorded modification time is refreshed).
+
+    Args:
+        file (str): The path of the input file.
+        encoding (str): The encoding the file is read with.
+    Returns:
+        str: The cache directory path, or none if there is no up-to-date cached copy.
+    """
+    path = cache_path(file, encoding)
+    meta = read_meta(path)
+    if meta is None:
+        return None
+    stat = os.stat(file)
+    if meta['size'] == stat.st_size and meta['mtime'] == stat.st_mtime_ns:
+        return path
+    if meta['size'] != stat.st_size or meta['sha256'] != hash_file(file):
+        return None
+    meta['mtime'] = stat.st_mtime_ns
+    write_meta(path, meta)
+    return path
+
+
+def write_meta (path, meta):
+    """ Writes the metadata of a cached copy.
+
+    Args:
+        path (str): The cache directory path.
+        meta (dict): The metadata.
+    """
+    with open(os.path.join(path, 'meta.json'), 'w') as target:
+        json.dump(meta, target)
+
+
+def store (file, df, encoding=None):
+    """ Stores a sorted data frame as the cached copy of a file.
+
+    Numeric columns are stored as NumPy arrays, text columns as newline-separated UTF-8 with a mask of missing values.
+    Text containing newlines can't be stored this way, in which case nothing is cached. Failures to write the cache
+    (e.g. a read-only data directory) are reported but otherwise ignored.
+
+    Args:
+        file (str): The path of the input file.
+        df (DataFrame): The data frame loaded from the file, sorted by probability.
+        encoding (str): The encoding the file was read with.
+    """
+    stat = os.stat(file)
+    meta = {'version': CACHE_FORMAT_VERSION, 'file': os.path.abspath(file), 'size': stat.st_size,
+        'mtime': stat.st_mtime_ns, 'sha256': hash_file(file), 'rows': len(df.index), 'columns': []}
+    path = cache_path(file, encoding)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = tempfile.mkdtemp(dir=os.path.dirname(path))
+        for i, column in enumerate(df.columns):
+            values = df[column]
+            if values.dtype.kind in 'biuf':
+                np.save(os.path.join(temp, f'{i}.npy'), values.to_numpy())
+                meta['columns'].append({'name': column, 'kind': 'numeric'})
+                continue
+            nulls = values.isna().to_numpy()
+            text = ['' if null else str(value) for value, null in zip(values, nulls)]
+            if any('\n' in value for value in text):
+                shutil.rmtree(temp)
+                return # Can't be stored newline-separated.
+            with open(os.path.join(temp, f'{i}.txt'), 'w', encoding='utf-8', errors='surrogatepass') as target:
+                target.write('\n'.join(text))
+            np.save(os.path.join(temp, f'{i}.nulls.npy'), nulls)
+            meta['columns'].append({'name': column, 'kind': 'text'})
+        write_meta(temp, meta)
+        # Swap in the new copy, leaving any concurrently built copy alone.
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.rename(temp, path)
+        except OSError:
+            shutil.rmtree(temp)
+    except OSError as err:
+        print(f'Could not cache \'{file}\' ({err}), continuing without.', file=sys.stderr)
+
+
+def load (path):
+    """ Loads a cached copy of a file.
+
+    Numeric columns are memory-mapped rather than read, and the data frame is built around them without copying, so
+    they are read-only and paged in only as they are used.
+
+    Args:
+        path (str): The cache directory path.
+    Returns:
+        DataFrame: The data frame, sorted by probability.
+    """
+    meta = read_meta(path)
+    columns = {}
+    for i, column in enumerate(meta['columns']):
+        if column['kind'] == 'numeric':
+            # Plain array views of the map, so the `memmap` type doesn't leak into results computed from them.
+            columns[column['name']] = np.asarray(np.load(os.path.join(path, f'{i}.npy'), mmap_mode='r'))
+            continue
+        with open(os.path.join(path, f'{i}.txt'), encoding='utf-8', errors='surrogatepass') as target:
+            values = pd.Series(target.read().split('\n') if meta['rows'] > 0 else [], dtype=object)
+        nulls = np.load(os.path.join(path, f'{i}.nulls.npy'))
+        if nulls.any():
+            values[nulls] = np.nan
+        columns[column['name']] = values
+    return pd.DataFrame(columns, copy=False)
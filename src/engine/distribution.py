@@ -0,0 +1,43 @@
+import pandas as pd
+
+from engine import distcache
+from engine.ranking import is_sorted
+
+
+def load_distribution (file, encoding=None, cache=True, sort=True):
+    """ Loads a password probability distribution from a CSV file, sorted by descending probability.
+
+    Unless asked not to, a pre-sorted binary copy of the file is kept (see `distcache`) and loaded instead of parsing
+    and sorting the CSV again, for as long as the file doesn't change. Files that are already sorted aren't sorted
+    again. Callers that only need the top of the distribution or sums at fixed ranks (see `ranking`) can skip sorting
+    altogether, in which case no cached copy is kept, though an existing one is still used.
+
+    Args:
+        file (str): The path of the CSV file to load.
+        encoding (str): The encoding of the file (pandas default if not specified).
+        cache (bool): Whether or not to use (and keep) a cached copy of the file.
+        sort (bool): Whether or not the data frame must be sorted.
+    Returns:
+        DataFrame: The loaded data frame, sorted by probability (if required) with its index reset.
+    """
+    # Use cached copy if there's an up-to-date one.
+    path = distcache.lookup(file, encoding) if cache else None
+    if path is not None:
+        return distcache.load(path)
+
+    # Read data frame from file.
+    df = pd.read_csv(file, skipinitialspace=True, skip_blank_lines=True, encoding=encoding)
+
+    # Caller will make do without sorting.
+    if not sort:
+        return df
+
+    # Sort by probability and reset index, unless already sorted.
+    if not is_sorted(df['probability'].to_numpy()):
+        df.sort_values(by=['probability'], ascending=False, inplace=True)
+        df.reset_index(drop=True, inplace=True)
+
+    # Keep a cached copy for next time.
+    if cache:
+        distcache.store(file, df, encoding)
+    return df
@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+import numpy as np
+
+from engine import distcache
+from composition.policy import parse_spec
+from composition.vectorized import analyse_series, dict_hits
+from model.Policy import THRESHOLDS, THRESHOLD_FEATURES
+
+
+# The name of the directory, inside the cached copy of a file, in which its feature matrix is kept.
+FEATURES_DIR_NAME = 'features'
+
+# Bump this whenever features or their layout change, so old matrices are rebuilt rather than misread.
+FEATURES_FORMAT_VERSION = 1
+
+# Maps special additional requirements to the flag columns that rule passwords out.
+SPEC_FEATURES = {'norep': 'has_rep', 'noconsec': 'has_consec', 'nodate': 'is_date'}
+
+
+def compact (values):
+    """ Converts an array of non-negative counts or flags to the smallest integer type that holds them.
+
+    Args:
+        values (ndarray): The values.
+    Returns:
+        ndarray: The values, in a compact type.
+    """
+    if values.dtype == bool:
+        return values
+    return values.astype(np.min_scalar_type(values.max() if len(values) > 0 else 0))
+
+
+class FeatureMatrix:
+    """ Represents the character features of every password in a distribution, for checking threshold policies with
+    array comparisons rather than string operations.
+
+    Dictionary hits are computed the first time each dictionary is needed, and kept with the rest of the matrix.
+    """
+
+    def __init__ (self, columns, pwds, path=None):
+        """ Constructs a new feature matrix.
+
+        Args:
+            columns (dict): Arrays of each feature, by name (see `analyse_series`).
+            pwds (Series of str): The passwords, for computing dictionary hits.
+            path (str): The directory the matrix is kept in, or none if it isn't kept.
+        """
+        self.columns = columns
+        self.pwds = pwds
+        self.path = path
+        self.dicts = {} # Dictionary hits, by dictionary file.
+
+    def dict_hits (self, file, dict):
+        """ Gets whether or not each password is in a dictionary.
+
+        Args:
+            file (str): The path of the dictionary file.
+            dict (frozenset of str): The dictionary, as loaded by `load_dict`.
+        Returns:
+            ndarray of bool: True for each password that is in the dictionary.
+        """
+        if file in self.dicts:
+            return self.dicts[file]
+        # Dictionaries are keyed by contents, so editing one doesn't leave stale hits behind.
+        column = None if self.path is None else os.path.join(self.path, f'dict-{distcache.hash_file(file)}.npy')
+        if column is not None and os.path.isfile(column):
+            hits = np.load(column, mmap_mode='r')
+        else:
+            hits = dict_hits(self.pwds, dict)
+            if column is not None:
+                save_column(column, hits)
+        self.dicts[file] = hits
+        return hits
+
+    def mask (self, policy, invert=False, rows=None):
+        """ Checks whether or not each password complies with a trusted-mode policy.
+
+        Args:
+            policy (Policy): The policy to check against.
+            invert (bool): Whether to not to invert the policy.
+            rows (ndarray of int): The positions of the passwords to check (all of them if not given).
+        Returns:
+            ndarray of bool: True for each password checked that is compliant, otherwise false.
+        """
+        select = (lambda values: values) if rows is None else (lambda values: values[rows])
+        out = np.ones(len(self.pwds) if rows is None else len(rows), dtype=bool)
+        for threshold in THRESHOLDS:
+            if getattr(policy, threshold) > 0:
+                out &= select(self.columns[THRESHOLD_FEATURES[threshold]]) >= getattr(policy, threshold)
+        for entry, (req, dict) in zip(policy.spec, parse_spec(tuple(policy.spec))):
+            if req == 'dict':
+                out &= ~select(self.dict_hits(entry.split(':', 1)[1], dict))
+            elif req in SPEC_FEATURES:
+                out &= ~select(self.columns[SPEC_FEATURES[req]])
+        return invert ^ out
+
+
+def save_column (file, values):
+    """ Saves a column of a feature matrix, replacing it atomically so that concurrent readers never see half of it.
+
+    Failures (e.g. a read-only data directory) are reported but otherwise ignored.
+
+    Args:
+        file (str): The path to save the column to.
+        values (ndarray): The column.
+    """
+    try:
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(file), suffix='.npy')
+        with os.fdopen(fd, 'wb') as target:
+            np.save(target, values)
+        os.replace(temp, file)
+    except OSError as err:
+        print(f'Could not store feature column ({err}), continuing without.', file=sys.stderr)
+
+
+def load_features (file, df, encoding=None):
+    """ Loads the feature matrix of a distribution, computing it if it hasn't been already.
+
+    The matrix is kept inside the cached copy of the file (see `distcache`), in the same row order, so it goes away
+    whenever the cached copy is rebuilt. If there's no cached copy, the matrix is computed but not kept.
+
+    Args:
+        file (str): The path of the CSV file the distribution was loaded from.
+        df (DataFrame): The distribution, as loaded by `load_distribution`.
+        encoding (str): The encoding the file was read with.
+    Returns:
+        FeatureMatrix: The feature matrix.
+    """
+    pwds = df['password'].map(str)
+    cache = distcache.lookup(file, encoding)
+    path = None if cache is None else os.path.join(cache, FEATURES_DIR_NAME)
+
+    # Use the kept matrix if there's one for these rows.
+    if path is not None:
+        try:
+            with open(os.path.join(path, 'meta.json')) as target:
+                meta = json.load(target)
+            if meta['version'] == FEATURES_FORMAT_VERSION and meta['rows'] == len(df.index):
+                columns = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in meta['columns']}
+                return FeatureMatrix(columns, pwds, path)
+        except (OSError, ValueError, KeyError):
+            pass # Missing or unreadable, compute it again.
+
+    # One pass over the passwords computes every feature.
+    columns = {name: compact(values) for name, values in analyse_series(pwds).items()}
+    if path is None:
+        return FeatureMatrix(columns, pwds)
+
+    # Keep it for next time, leaving any concurrently built matrix alone.
+    try:
+        temp = tempfile.mkdtemp(dir=cache)
+        for name, values in columns.items():
+            np.save(os.path.join(temp, f'{name}.npy'), values)
+        with open(os.path.join(temp, 'meta.json'), 'w') as target:
+            json.dump({'version': FEATURES_FORMAT_VERSION, 'rows': len(df.index), 'columns': list(columns)}, target)
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.rename(temp, path)
+        except OSError:
+            shutil.rmtree(temp)
+    except OSError as err:
+        print(f'Could not store features of \'{file}\' ({err}), continuing without.', file=sys.stderr)
+        return FeatureMatrix(columns, pwds)
+    return FeatureMatrix(columns, pwds, path)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from model.Filtration import Filtration
+
+
+def filter_mask (df, mask):
+    """ Applies a compliance mask to a sorted data frame.
+
+    Args:
+        df (DataFrame): The data frame to filter, sorted by probability.
+        mask (Series of bool): True for each row to keep.
+    Returns:
+        Filtration: The filtration result.
+    """
+    # Get total probability.
+    total_prob = df['probability'].sum()
+
+    # Filter passwords and reset index again.
+    filtered = df[mask].reset_index(drop=True)
+
+    # Get 'surplus' probability.
+    surplus = total_prob - filtered['probability'].sum()
+    return Filtration(total_prob, surplus, filtered)
+
+
+def policy_mask (df, policy, invert=False):
+    """ Computes the compliance mask of a data frame according to a trusted-mode policy.
+
+    Args:
+        df (DataFrame): The data frame to check.
+        policy (Policy): The policy to check against.
+        invert (bool): Whether or not to invert the policy.
+    Returns:
+        ndarray of bool: True for each compliant row.
+    """
+    return np.asarray(policy.mask(df['password'].map(str), invert), dtype=bool)
+
+
+def authority_mask (df, authority, invert=False):
+    """ Computes the compliance mask of a data frame according to a Skeptic Authority.
+
+    Args:
+        df (DataFrame): The data frame to check.
+        authority (Authority): The authority to consult.
+        invert (bool): Whether or not to invert the policy.
+    Returns:
+        ndarray of bool: True for each compliant row.
+    """
+    verdicts = authority.ask_many([str(pwd) for pwd in df['password']])
+    return np.array([invert ^ verdict for verdict in verdicts], dtype=bool)
+
+
+def filter_policy (df, policy, invert=False):
+    """ Filters a data frame according to a trusted-mode policy.
+
+    Args:
+        df (DataFrame): The data frame to filter, sorted by probability.
+        policy (Policy): The policy to filter by.
+        invert (bool): Whether or not to invert the policy.
+    Returns:
+        Filtration: The filtration result.
+    """
+    return filter_mask(df, policy_mask(df, policy, invert))
+
+
+def filter_authority (df, authority, invert=False):
+    """ Filters a data frame according to a Skeptic Authority.
+
+    Args:
+        df (DataFrame): The data frame to filter, sorted by probability.
+        authority (Authority): The authority to consult.
+        invert (bool): Whether or not to invert the policy.
+    Returns:
+        Filtration: The filtration result.
+    """
+    return filter_mask(df, authority_mask(df, authority, invert))
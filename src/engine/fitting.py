@@ -0,0 +1,141 @@
+import numpy as np
+
+from engine.blocks import has_blocks, total_entries, cumulative_at, probability_at
+
+
+def bin_starts (n, base=2):
+    """ Computes the starting positions of logarithmic bins over a number of values.
+
+    The first bin has a width of 1, and each bin after that is `base` times as wide as the last (rounded down, but
+    never narrower than 1). For the default base of 2, bins start at positions 0, 1, 3, 7, 15 and so on.
+
+    Args:
+        n (int): The number of values to bin.
+        base (float): The factor by which each bin is wider than the last (greater than 1).
+    Returns:
+        ndarray of int: The starting position of each bin.
+    """
+    if base <= 1:
+        raise ValueError('Bin base must be greater than 1.')
+    starts = []
+    start, width = 0, 1.0
+    while start < n:
+        starts.append(start)
+        start += max(1, int(width))
+        width *= base
+    return np.array(starts, dtype=int)
+
+
+def log_bin (y, base=2, average=False):
+    """ Performs logarithmic binning on values ordered by rank.
+
+    Args:
+        y (ndarray of float): The values, ordered by rank (the first value has rank 1).
+        base (float): The factor by which each bin is wider than the last (see `bin_starts`).
+        average (bool): Whether to average within each bin, or sample the first value in each bin.
+    Returns:
+        pair: The binned x (rank) and y values, in a pair.
+    """
+    y = np.asarray(y, dtype=float)
+    starts = bin_starts(len(y), base)
+    if not average:
+        return (starts + 1).astype(float), y[starts]
+    ends = np.append(starts[1:], len(y))
+    # Average values within each bin, placing each at the geometric mean of its first and last rank.
+    return np.sqrt((starts + 1.0) * ends), np.add.reduceat(y, starts) / (ends - starts)
+
+
+def log_bin_blocks (df, base=2, average=False):
+    """ Performs logarithmic binning on a data frame containing run-length blocks, without expanding them.
+
+    Args:
+        df (DataFrame): The data frame, sorted by probability.
+        base (float): The factor by which each bin is wider than the last (see `bin_starts`), or none for no binning.
+        average (bool): Whether to average within each bin, or sample the first value in each bin.
+    Returns:
+        pair: The binned x (rank) and y values, in a pair.
+    """
+    entries = total_entries(df)
+    starts = np.arange(entries) if base is None else bin_starts(entries, base)
+    if not average or base is None:
+        return (starts + 1).astype(float), probability_at(df, starts)
+    ends = np.append(starts[1:], entries)
+    sums = cumulative_at(df, ends) - cumulative_at(df, starts)
+    return np.sqrt((starts + 1.0) * ends), sums / (ends - starts)
+
+
+def rank_values (df, binning=True, base=2, average=False, transform=None):
+    """ Gets the rank (x) and probability (y) values to fit a power law to.
+
+    Args:
+        df (DataFrame): The data frame to fit, sorted by probability.
+        binning (bool): Whether or not to bin values logarithmically.
+        base (float): The factor by which each bin is wider than the last (see `bin_starts`).
+        average (bool): Whether to average within each bin, or sample the first value in each bin.
+        transform (Transform): The reselection transform to apply to the data frame, if any.
+    Returns:
+        pair: The x and y values, in a pair.
+    """
+    # Run-length blocks are binned without expanding them.
+    if has_blocks(df):
+        x, y = log_bin_blocks(df, base if binning else None, average)
+        return x, y if transform is None else transform.apply(y, 0 if len(y) > 0 else None)
+
+    # Get raw frequency values (these go on the Y axis).
+    ry = df['probability'].to_numpy(dtype=float)
+
+    # Bin values, or generate ranks (these go on the X axis) as floats.
+    if binning:
+        x, y = log_bin(ry, base, average)
+    else:
+        x, y = np.arange(1, len(ry) + 1, dtype=float), ry
+
+    # Transforms are affine apart from the top value, which is always alone in the first bin.
+    if transform is not None:
+        y = transform.apply(y, 0 if len(y) > 0 else None)
+    return x, y
+
+
+def fit_powerlaw (x, y, method='lstsq'):
+    """ Fits a power law to rank/probability values by least squares on their logarithms.
+
+    The fit is a straight line in log-log space, solved in closed form with NumPy by default. SciPy's iterative
+    `optimize.leastsq` may be used instead, in which case SciPy is imported on demand.
+
+    Args:
+        x (ndarray of float): The x-values (ranks).
+        y (ndarray of float): The y-values (probabilities).
+        method (str): The solver to use, either 'lstsq' (closed form) or 'leastsq' (SciPy).
+    Returns:
+        dict: The amplitude (`amp`) and exponent (`alpha`) of the fitted power law, with the coefficient of
+            determination (`r2`) and sum of squared residuals (`ssr`) of the log-log fit, and the covariance matrix of
+            its intercept and slope (`covar`, none if there are too few points to estimate it).
+    """
+    # It's much better to perform a least-squares fit on the logarithms.
+    logx = np.log10(x)
+    logy = np.log10(y)
+    design = np.column_stack((np.ones(len(logx)), logx))
+
+    # Least squares fitting.
+    if method == 'lstsq':
+        params_final = np.linalg.lstsq(design, logy, rcond=None)[0]
+    elif method == 'leastsq':
+        from scipy import optimize # Only needed for this solver.
+        error_func = lambda p, x, y: y - (p[0] + p[1] * x)
+        params_final = optimize.leastsq(error_func, [1.0, -1.0], args=(logx, logy))[0]
+    else:
+        raise ValueError(f'Unknown fitting method \'{method}\'.')
+
+    # Goodness of fit, in log-log space.
+    residuals = logy - design @ params_final
+    ssr = float(residuals @ residuals)
+    sst = float(np.sum((logy - logy.mean()) ** 2))
+    r2 = 1 - ssr / sst if sst > 0 else 1.0
+    covar = None
+    if len(logx) > 2:
+        covar = (ssr / (len(logx) - 2) * np.linalg.pinv(design.T @ design)).tolist()
+
+    # Get alpha and amplitude.
+    alpha = float(params_final[1])
+    amp = float(10.0 ** params_final[0])
+    return {'amp': amp, 'alpha': alpha, 'r2': r2, 'ssr': ssr, 'covar': covar}
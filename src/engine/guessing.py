@@ -0,0 +1,122 @@
+import numpy as np
+
+from engine.ranking import is_sorted, cumulative_at_ranks
+from engine.blocks import has_blocks, total_entries, cumulative_at, weighted_at, guesses_to_reach
+
+
+# Obviously, percentile means a 100th.
+PERCENTILE_DENOM = 100
+
+
+def cumulative_curve (df):
+    """ Computes the cumulative probability of an optimal guessing attack after each number of guesses.
+
+    Args:
+        df (DataFrame): The data frame to guess against, sorted by probability.
+    Returns:
+        ndarray of float: The cumulative probability after 0, 1, ..., n guesses (n + 1 values).
+    """
+    if has_blocks(df):
+        return cumulative_at(df, np.arange(total_entries(df) + 1))
+    return np.concatenate(([0.0], np.cumsum(df['probability'].to_numpy(dtype=float))))
+
+
+def guess_optimally (df, perc_mode=False, transform=None):
+    """ Computes the cumulative probability of an optimal guessing attack on a distribution.
+
+    In percentile mode, cumulative probabilities are sampled at (up to) 99 evenly spaced numbers of guesses, starting
+    from 0, followed by the total. If the data frame isn't sorted, these are found by partial selection rather than
+    sorting the whole data frame. A reselection transform preserves order, so it's applied to the cumulative
+    probabilities themselves rather than to the data frame.
+
+    Args:
+        df (DataFrame): The data frame to guess against, sorted by probability unless in percentile mode.
+        perc_mode (bool): Whether or not to sample only 100 cumulative probabilities (percentile mode).
+        transform (Transform): The reselection transform to apply to the data frame, if any.
+    Returns:
+        list of float: The cumulative probabilities.
+    """
+    probs = df['probability'].to_numpy(dtype=float)
+    if has_blocks(df) and not is_sorted(probs):
+        df = df.sort_values(by=['probability'], ascending=False) # Blocks are few rows, so just sort.
+        probs = df['probability'].to_numpy(dtype=float)
+    if not perc_mode:
+        if not is_sorted(probs):
+            df = df.sort_values(by=['probability'], ascending=False)
+        curve = cumulative_curve(df)
+        return (curve if transform is None else transform.apply_cumulative(curve)).tolist()
+    entries = total_entries(df)
+    interval = max(1, entries // PERCENTILE_DENOM) # Sampling interval, there may be fewer than 100 entries.
+    ranks = np.append(np.arange(0, entries, interval)[:PERCENTILE_DENOM - 1], entries) # Don't collect too many data points.
+    if has_blocks(df):
+        points = cumulative_at(df, ranks)
+    elif is_sorted(probs):
+        points = cumulative_curve(df)[ranks]
+    else:
+        points = cumulative_at_ranks(probs, ranks)
+    if transform is not None:
+        points = transform.apply_cumulative(points, ranks)
+    return points.tolist()
+
+
+def success_rates (df, budgets):
+    """ Computes the β-success rate (the probability of success within β guesses) for each of a number of budgets.
+
+    Args:
+        df (DataFrame): The data frame to guess against, sorted by probability.
+        budgets (list of int): The guess budgets (β), larger budgets than there are entries are capped.
+    Returns:
+        list of float: The success rate for each budget.
+    """
+    if has_blocks(df):
+        return cumulative_at(df, np.clip(np.asarray(budgets, dtype=int), 0, total_entries(df))).tolist()
+    curve = cumulative_curve(df)
+    return curve[np.clip(np.asarray(budgets, dtype=int), 0, len(curve) - 1)].tolist()
+
+
+def alpha_guesswork (df, alphas):
+    """ Computes the α-guesswork (the expected number of guesses per account to break a fraction α of accounts) for
+    each of a number of success rates, as defined by Bonneau.
+
+    Args:
+        df (DataFrame): The data frame to guess against, sorted by probability.
+        alphas (list of float): The target success rates (α), between 0 and 1.
+    Returns:
+        list of float: The α-guesswork for each success rate, or none where α is never reached.
+    """
+    if has_blocks(df):
+        out = []
+        for alpha in alphas:
+            guesses = guesses_to_reach(df, alpha)
+            if guesses is None:
+                out.append(None)
+            else:
+                success, weighted = cumulative_at(df, [guesses])[0], weighted_at(df, [guesses])[0]
+                out.append(float((1 - success) * guesses + weighted))
+        return out
+    curve = cumulative_curve(df)
+    # Partial sums of i * p_i, for the expected number of guesses on accounts broken so far.
+    weighted = np.concatenate(([0.0], np.cumsum(np.arange(1, len(curve)) * df['probability'].to_numpy(dtype=float))))
+    out = []
+    for alpha in alphas:
+        guesses = int(np.searchsorted(curve, alpha, side='left')) # The fewest guesses with success of at least α.
+        if guesses >= len(curve):
+            out.append(None)
+        else:
+            out.append(float((1 - curve[guesses]) * guesses + weighted[guesses]))
+    return out
+
+
+def guessing_entropy (df):
+    """ Computes the guessing entropy (G-value), the expected number of guesses to break an account, as defined by
+    Massey.
+
+    Args:
+        df (DataFrame): The data frame to guess against, sorted by probability.
+    Returns:
+        float: The guessing entropy.
+    """
+    if has_blocks(df):
+        return float(weighted_at(df, [total_entries(df)])[0])
+    probs = df['probability'].to_numpy(dtype=float)
+    return float(np.sum(np.arange(1, len(probs) + 1) * probs))
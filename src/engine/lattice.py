@@ -0,0 +1,55 @@
+def policy_parents (definitions):
+    """ Finds, for each of a number of policies, the strictest other policies it implies (see `Policy.implies`).
+
+    Every password that complies with a policy complies with its parents, so it only needs checking against the
+    passwords that survived them. Of policies that imply each other, the one given later is the child, so that no
+    policy is its own ancestor.
+
+    Args:
+        definitions (dict): The policies, by name, in order.
+    Returns:
+        dict: The names of the parents of each policy, by name, in order (empty for policies without parents).
+    """
+    names = list(definitions)
+    weaker = {}
+    for i, name in enumerate(names):
+        policy = definitions[name]
+        weaker[name] = [other for j, other in enumerate(names) if j != i and policy.implies(definitions[other]) and
+            (j < i or not definitions[other].implies(policy))]
+    # Keep only the strictest, as their survivors are also survivors of the rest.
+    return {name: [parent for parent in weaker[name] if not any(parent in weaker[other] for other in weaker[name])]
+        for name in names}
+
+
+def lattice_order (parents):
+    """ Orders policies so that each comes after all of its parents.
+
+    Args:
+        parents (dict): The names of the parents of each policy, by name (see `policy_parents`).
+    Returns:
+        list of str: The policy names, otherwise in their original order.
+    """
+    order = []
+    while len(order) < len(parents):
+        order += [name for name in parents if not name in order and all(parent in order for parent in parents[name])]
+    return order
+
+
+def nearest_parents (parents, name, included):
+    """ Finds the strictest policies a policy implies, out of only some of the policies.
+
+    Parents that aren't included are passed over in favour of their own nearest parents.
+
+    Args:
+        parents (dict): The names of the parents of each policy, by name (see `policy_parents`).
+        name (str): The name of the policy.
+        included (collection of str): The names of the policies that may be returned.
+    Returns:
+        list of str: The names of the nearest included policies the policy implies.
+    """
+    nearest = []
+    for parent in parents[name]:
+        for ancestor in [parent] if parent in included else nearest_parents(parents, parent, included):
+            if not ancestor in nearest:
+                nearest.append(ancestor)
+    return nearest
@@ -0,0 +1,162 @@
+import os
+import json
+import hashlib
+import tempfile
+import importlib.util
+
+from engine import distcache
+
+
+# Bump this whenever a change to the tool changes its output, so that every cell is recomputed.
+TOOL_VERSION = 1
+
+# The name of the manifest file, kept in the output directory of a sweep.
+MANIFEST_FILE_NAME = 'manifest.json'
+
+
+def digest (*parts):
+    """ Computes a SHA-256 hash of a number of JSON-serializable values.
+
+    Args:
+        parts (list): The values to hash.
+    Returns:
+        str: The hex digest of the hash.
+    """
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def file_digest (file):
+    """ Computes the SHA-256 hash of a file's contents, reusing the hash recorded for its cached copy if up to date.
+
+    Args:
+        file (str): The path of the file.
+    Returns:
+        str: The hex digest of the hash.
+    Raises:
+        OSError: If the file can't be read.
+    """
+    path = distcache.lookup(file)
+    meta = None if path is None else distcache.read_meta(path)
+    return distcache.hash_file(file) if meta is None else meta['sha256']
+
+
+def policy_digest (policy, authority, definition):
+    """ Computes a hash identifying a policy, as filtration by it would be carried out.
+
+    Args:
+        policy (str): The name of the policy.
+        authority (str): The authority binary used for filtration (ignored in trusted mode).
+        definition (Policy): The policy for pure Python filtration (trusted mode), or none to use the authority.
+    Returns:
+        str: The hex digest of the hash.
+    Raises:
+        OSError: If the authority binary or a dictionary file can't be read.
+    """
+    if definition is None:
+        return digest('authority', policy, distcache.hash_file(authority))
+    # Dictionaries are part of the definition too.
+    dicts = [distcache.hash_file(entry.split(':', 1)[1]) for entry in definition.spec if entry.startswith('dict:')]
+    return digest('trusted', definition.to_dict(), dicts)
+
+
+def mode_digest (mode):
+    """ Computes a hash identifying a reselection mode, from its plugin's source.
+
+    Args:
+        mode (str): The name of the reselection mode (must correspond to module under `./modes`).
+    Returns:
+        str: The hex digest of the hash.
+    Raises:
+        ImportError: If there's no plugin for the reselection mode.
+        OSError: If the plugin's source can't be read.
+    """
+    spec = importlib.util.find_spec(mode)
+    if spec is None or spec.origin is None:
+        raise ModuleNotFoundError(f'No plugin found for reselection mode \'{mode}\'.', name=mode)
+    return digest('mode', mode, distcache.hash_file(spec.origin))
+
+
+def file_state (file):
+    """ Gets the size and modification time of a file, to tell if it has changed since.
+
+    Args:
+        file (str): The path of the file.
+    Returns:
+        list: The size and modification time, or none if the file doesn't exist.
+    """
+    try:
+        stat = os.stat(file)
+        return [stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        return None
+
+
+class Manifest:
+    """ Records the outputs of each cell of a sweep, with a key identifying everything those outputs depend on.
+    """
+
+    def __init__ (self, file, cells={}):
+        """ Constructs a new instance of a sweep manifest.
+
+        Args:
+            file (str): The path of the manifest file.
+            cells (dict): The recorded cells, by name.
+        """
+        self.file = file
+        self.cells = dict(cells)
+
+    def is_current (self, name, key):
+        """ Checks whether or not a cell's outputs are up to date.
+
+        They are if the cell was recorded with the same key, and none of its outputs has changed since.
+
+        Args:
+            name (str): The name of the cell.
+            key (str): The key identifying everything the cell's outputs depend on.
+        Returns:
+            bool: True if the cell's outputs are up to date, otherwise false.
+        """
+        cell = self.cells.get(name)
+        if cell is None or cell['key'] != key:
+            return False
+        return all(file_state(output) == state for output, state in cell['outputs'].items())
+
+    def record (self, name, key, outputs):
+        """ Records a cell's outputs, and saves the manifest.
+
+        Args:
+            name (str): The name of the cell.
+            key (str): The key identifying everything the cell's outputs depend on.
+            outputs (list of str): The paths of the cell's outputs.
+        """
+        self.cells[name] = {'key': key, 'outputs': {output: file_state(output) for output in outputs}}
+        self.save()
+
+    def save (self):
+        """ Saves the manifest, replacing the file all at once so that it's never left half-written.
+        """
+        dir = os.path.dirname(os.path.abspath(self.file))
+        with tempfile.NamedTemporaryFile('w', dir=dir, suffix='.tmp', delete=False) as target:
+            json.dump({'version': TOOL_VERSION, 'cells': self.cells}, target, indent=2, sort_keys=True)
+        os.replace(target.name, self.file)
+
+    @staticmethod
+    def load (dir):
+        """ Loads the manifest kept in an output directory.
+
+        A missing or unreadable manifest, or one written by another version of the tool, is treated as empty.
+
+        Args:
+            dir (str): The output directory.
+        Returns:
+            Manifest: The loaded manifest.
+        """
+        file = os.path.join(dir, MANIFEST_FILE_NAME)
+        try:
+            with open(file) as target:
+                raw = json.load(target)
+            if raw.get('version') == TOOL_VERSION:
+                return Manifest(file, raw['cells'])
+        except (OSError, ValueError):
+            pass
+        return Manifest(file)
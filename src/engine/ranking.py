@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def is_sorted (probs):
+    """ Checks whether or not probabilities are already sorted in descending order.
+
+    Args:
+        probs (ndarray of float): The probabilities.
+    Returns:
+        bool: True if the probabilities are sorted in descending order, otherwise false.
+    """
+    return bool(np.all(probs[:-1] >= probs[1:]))
+
+
+def top_k (probs, k):
+    """ Finds the positions of the k highest probabilities without sorting all of them.
+
+    Args:
+        probs (ndarray of float): The probabilities.
+        k (int): The number of positions to find.
+    Returns:
+        ndarray of int: The positions of the k highest probabilities, highest first.
+    """
+    k = min(k, len(probs))
+    if k == 0:
+        return np.array([], dtype=int)
+    top = np.argpartition(-probs, k - 1)[:k]
+    return top[np.argsort(-probs[top], kind='stable')]
+
+
+def cumulative_at_ranks (probs, ranks):
+    """ Computes the sum of the highest r probabilities for each of a number of ranks r, without a full sort.
+
+    Partitioning around every requested rank at once leaves each run of probabilities between consecutive ranks in
+    place, unordered, which is all that is needed to sum them.
+
+    Args:
+        probs (ndarray of float): The probabilities.
+        ranks (list of int): The ranks, each between 0 and the number of probabilities.
+    Returns:
+        ndarray of float: The sum of the highest r probabilities for each rank r.
+    """
+    ranks = np.asarray(ranks, dtype=int)
+    inner = np.unique(ranks[(ranks > 0) & (ranks < len(probs))])
+    parted = np.partition(-probs, inner) if len(inner) > 0 else -probs
+    # Sum each run between consecutive ranks, then accumulate the runs.
+    bounds = np.concatenate(([0], inner, [len(probs)]))
+    runs = np.add.reduceat(-parted, bounds[:-1]) if len(probs) > 0 else np.array([])
+    totals = dict(zip(bounds, np.concatenate(([0.0], np.cumsum(runs)))))
+    return np.array([totals[rank] for rank in ranks])
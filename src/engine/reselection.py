@@ -0,0 +1,89 @@
+import numpy as np
+
+from model.Transform import Transform
+from shared.moduleloading import load_resel_mode
+
+
+# The number of rows to transform and write at a time, when a reselection is applied lazily.
+WRITE_CHUNK_SIZE = 100000
+
+
+def get_transform (mode, filtration):
+    """ Gets the transform declared by a reselection mode for a filtration result.
+
+    Modes that can be expressed as a transform (see `Transform`) declare it with a `transform(total, surplus, count)`
+    function. Modes that can't (such as extraneous reselection) only provide `reselect(total, surplus, df)`.
+
+    Args:
+        mode (str): The name of the reselection mode (must correspond to module under `./modes`), or none.
+        filtration (Filtration): The filtration result to reselect.
+    Returns:
+        Transform: The transform, or none if the mode doesn't declare one.
+    """
+    if mode is None:
+        return Transform()
+    reselector = load_resel_mode(mode)
+    if not hasattr(reselector, 'transform'):
+        return None
+    return reselector.transform(filtration.total, filtration.surplus, filtration.count)
+
+
+def reselect (mode, filtration):
+    """ Applies a reselection mode to a filtration result.
+
+    The filtration result itself is left untouched, so that it can be reselected again in another mode.
+
+    Args:
+        mode (str): The name of the reselection mode (must correspond to module under `./modes`), or none.
+        filtration (Filtration): The filtration result to reselect.
+    Returns:
+        DataFrame: The reselected data frame.
+    """
+    df = filtration.df.copy()
+    transform = get_transform(mode, filtration)
+    if transform is None:
+        return load_resel_mode(mode).reselect(filtration.total, filtration.surplus, df)
+    probs = df['probability'].to_numpy(dtype=float)
+    df['probability'] = transform.apply(probs, int(np.argmax(probs)))
+    return df
+
+
+def write_reselected (mode, filtration, out, materialise=False):
+    """ Applies a reselection mode to a filtration result, writing the result as CSV.
+
+    Where the mode declares a transform, it's applied a chunk at a time as output is written, and the filtration result
+    is returned along with the transform so that it can be applied lazily again (see `guess_optimally` and
+    `rank_values`). Otherwise, the reselected data frame is materialised and returned without a transform. Where the
+    mode adds rows standing for many passwords at once (see `engine.blocks`), those are only written out as literal
+    passwords if asked for, using the mode's `materialise(df)` function.
+
+    Args:
+        mode (str): The name of the reselection mode (must correspond to module under `./modes`), or none.
+        filtration (Filtration): The filtration result to reselect.
+        out (str or file): The file in which to place output.
+        materialise (bool): Whether or not to write out literal passwords in place of rows standing for many.
+    Returns:
+        pair: The data frame and the transform still to be applied to it (or none), in a pair.
+    """
+    transform = get_transform(mode, filtration)
+    if transform is None:
+        df = reselect(mode, filtration)
+        reselector = load_resel_mode(mode)
+        if materialise and hasattr(reselector, 'materialise'):
+            reselector.materialise(df).to_csv(out, index=False)
+        else:
+            df.to_csv(out, index=False)
+        return df, None
+    df = filtration.df
+    top = int(np.argmax(df['probability'].to_numpy(dtype=float))) if len(df.index) > 0 else None
+    stream = open(out, 'w', encoding='utf-8', newline='') if isinstance(out, str) else out
+    try:
+        for start in range(0, max(1, len(df.index)), WRITE_CHUNK_SIZE):
+            chunk = df.iloc[start:start + WRITE_CHUNK_SIZE].copy()
+            index = top - start if top is not None and start <= top < start + WRITE_CHUNK_SIZE else None
+            chunk['probability'] = transform.apply(chunk['probability'], index)
+            chunk.to_csv(stream, header=(start == 0), index=False)
+    finally:
+        if isinstance(out, str):
+            stream.close()
+    return df, transform
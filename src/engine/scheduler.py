@@ -0,0 +1,89 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Scheduler:
+    """ Runs a graph of tasks, each only once all of the tasks it depends on have finished.
+
+    With more than one job, tasks run on a pool of processes. Processes are forked, so that scripts without a main guard
+    aren't run again in each one. Where forking isn't available, tasks run one at a time in this process.
+    """
+
+    def __init__ (self, jobs=1):
+        """ Constructs a new instance of a task scheduler.
+
+        Args:
+            jobs (int): The number of tasks to run at once.
+        """
+        self.jobs = jobs
+        self.tasks = {}
+
+    def add (self, key, fn, args=(), deps=()):
+        """ Adds a task to the graph.
+
+        The task is called with its arguments followed by the results of the tasks it depends on, in order. Both must
+        be picklable if running on a pool of processes, as must its result.
+
+        Args:
+            key (hashable): The key by which to refer to the task, and to its result.
+            fn (function): The function to call.
+            args (tuple): The arguments to pass to the function.
+            deps (tuple): The keys of the tasks this task depends on, which must already have been added.
+        Returns:
+            hashable: The key of the task.
+        """
+        for dep in deps:
+            if not dep in self.tasks:
+                raise ValueError(f'Task {key} depends on unknown task {dep}.')
+        self.tasks[key] = (fn, tuple(args), tuple(deps))
+        return key
+
+    def call (self, key, results):
+        """ Gets the function and full arguments for a task whose dependencies have finished.
+
+        Args:
+            key (hashable): The key of the task.
+            results (dict): The results of finished tasks, by key.
+        Returns:
+            pair: The function and its arguments, in a pair.
+        """
+        fn, args, deps = self.tasks[key]
+        return fn, args + tuple(results[dep] for dep in deps)
+
+    def run (self, callback=None):
+        """ Runs every task in the graph.
+
+        Tasks are started in the order they were added, as soon as their dependencies allow. Results don't depend on
+        the order in which tasks finish. If any task raises an exception, no more tasks are started and the exception
+        is raised once running tasks have finished.
+
+        Args:
+            callback (function): Called with the key and result of each task as it finishes, in this process.
+        Returns:
+            dict: The result of each task, by key.
+        """
+        results = {}
+        if self.jobs <= 1 or not 'fork' in multiprocessing.get_all_start_methods():
+            # Tasks were added after their dependencies, so this order is always valid.
+            for key in self.tasks:
+                fn, args = self.call(key, results)
+                results[key] = fn(*args)
+                if callback is not None:
+                    callback(key, results[key])
+            return results
+        waiting = list(self.tasks)
+        running = {}
+        with ProcessPoolExecutor(self.jobs, mp_context=multiprocessing.get_context('fork')) as pool:
+            while waiting or running:
+                # Start every task that's ready.
+                for key in [key for key in waiting if all(dep in results for dep in self.tasks[key][2])]:
+                    fn, args = self.call(key, results)
+                    running[pool.submit(fn, *args)] = key
+                    waiting.remove(key)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    results[key] = future.result()
+                    if callback is not None:
+                        callback(key, results[key])
+        return results
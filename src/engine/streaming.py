@@ -0,0 +1,86 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from model.Filtration import Filtration
+from engine.reselection import get_transform, write_reselected
+
+
+# The default number of rows to read at a time when streaming.
+DEFAULT_CHUNK_SIZE = 1000000
+
+
+def read_chunks (file, chunksize):
+    """ Reads a CSV file of password probabilities a chunk at a time.
+
+    Args:
+        file (str): The path of the CSV file to read.
+        chunksize (int): The number of rows per chunk.
+    Returns:
+        iterator of DataFrame: The chunks, in file order.
+    """
+    return pd.read_csv(file, skipinitialspace=True, skip_blank_lines=True, chunksize=chunksize,
+        dtype={'password': str}) # Don't let numeric-looking chunks of passwords turn into numbers.
+
+
+def filter_streaming (file, check, out=None, mode=None, chunksize=DEFAULT_CHUNK_SIZE, materialise=False):
+    """ Filters a distribution and reselects what's left without ever loading the whole distribution into memory.
+
+    The first pass filters each chunk, keeping running totals, and spills compliant rows to a temporary file. The
+    second pass reselects those rows a chunk at a time, writing output as it goes. Modes that declare a transform
+    only need the totals from the first pass. Other modes need every compliant row at once, so those rows (but not
+    the rest of the distribution) are loaded into memory. Rows keep their file order, so output is only sorted if the
+    input was.
+
+    Args:
+        file (str): The path of the CSV file to filter.
+        check (function): Takes a chunk, returning a boolean mask with true for each compliant row.
+        out (str): The file in which to place output (standard output if none).
+        mode (str): The name of the reselection mode (must correspond to module under `./modes`), or none.
+        chunksize (int): The number of rows to process at a time.
+        materialise (bool): Whether or not to write out literal passwords in place of rows standing for many.
+    Returns:
+        Filtration: The filtration result, without a data frame.
+    """
+    temp = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    try:
+        # First pass: filter, keep running totals and spill compliant rows.
+        total = kept = 0.0
+        count = 0
+        top = top_row = None # The highest probability kept, and the position of the first row that has it.
+        with temp:
+            for i, chunk in enumerate(read_chunks(file, chunksize)):
+                total += chunk['probability'].sum()
+                chunk = chunk[np.asarray(check(chunk), dtype=bool)]
+                kept += chunk['probability'].sum()
+                probs = chunk['probability'].to_numpy(dtype=float)
+                if len(probs) > 0 and (top is None or probs.max() > top):
+                    top, top_row = probs.max(), count + int(np.argmax(probs))
+                count += len(chunk.index)
+                chunk.to_csv(temp, header=(i == 0), index=False)
+        filtration = Filtration(total, total - kept, None, count, top)
+        if filtration.is_empty():
+            return filtration
+
+        # Second pass: reselect and write output incrementally.
+        stream = sys.stdout if out is None else open(out, 'w', encoding='utf-8', newline='')
+        try:
+            transform = get_transform(mode, filtration)
+            if transform is not None:
+                # The top row is found by position, as probabilities read back from the file may be rounded.
+                start = 0
+                for i, chunk in enumerate(read_chunks(temp.name, chunksize)):
+                    transform.apply_chunk(chunk, start, top_row).to_csv(stream, header=(i == 0), index=False)
+                    start += len(chunk.index)
+            else:
+                survivors = Filtration(total, total - kept, pd.concat(read_chunks(temp.name, chunksize)))
+                write_reselected(mode, survivors, stream, materialise)
+        finally:
+            if out is not None:
+                stream.close()
+        return filtration
+    finally:
+        os.remove(temp.name)
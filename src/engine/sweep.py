@@ -0,0 +1,172 @@
+import os
+import time
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from engine.authority import Authority, AuthorityError, backoff_delay
+from engine.verdicts import CachedAuthority
+from engine.daemon import DaemonAuthority
+from engine.distribution import load_distribution
+from engine.features import load_features
+from engine.filtration import filter_mask, policy_mask, authority_mask
+from engine.reselection import write_reselected
+from engine.guessing import guess_optimally
+from engine.fitting import rank_values, fit_powerlaw
+from model.Filtration import Filtration
+
+
+# The total number of times to attempt to run filtration.
+FILT_RUN_RETRIES = 5
+
+
+def compute_out_path (dir, file, policy, mode, ext='csv'):
+    """ Computes the name of a file to write renormalized data to.
+
+    Args:
+        dir (str): The base output directory path.
+        file (str): The name of the original file.
+        policy (str): The name of the policy used to filter the data.
+        mode (str): The reselection mode used.
+        ext (str): The file extension to use.
+    """
+    file_name = os.path.splitext(os.path.basename(file))[0]
+    file_name += f'_{policy}_{mode}.{ext}'
+    return os.path.join(dir, file_name)
+
+
+@lru_cache(maxsize=1)
+def cached_distribution (file):
+    """ Loads a distribution sorted by probability, keeping the last one loaded in memory.
+
+    Tasks are scheduled file by file, so each process loads each file about once.
+
+    Args:
+        file (str): The path of the CSV file to load.
+    Returns:
+        DataFrame: The data frame, which must not be modified.
+    """
+    return load_distribution(file)
+
+
+@lru_cache(maxsize=1)
+def cached_features (file):
+    """ Loads the feature matrix of a distribution (see `cached_distribution`), keeping the last one loaded in memory.
+
+    Args:
+        file (str): The path of the CSV file to load.
+    Returns:
+        FeatureMatrix: The feature matrix.
+    """
+    return load_features(file, cached_distribution(file))
+
+
+def run_filtration (df, policy, authority, definition, cached=True, daemon=False, features=None, rows=None):
+    """ Computes the compliance mask of a distribution under a policy, retrying if the authority dies.
+
+    Args:
+        df (DataFrame): The data frame to filter, sorted by probability.
+        policy (str): The name of the policy to filter by.
+        authority (str): The authority binary to use for filtration (ignored in trusted mode).
+        definition (Policy): The policy for pure Python filtration (trusted mode), or none to use the authority.
+        cached (bool): Whether or not to check the verdict cache before asking the authority.
+        daemon (bool): Whether or not to ask a shared authority daemon, rather than launching the authority.
+        features (FeatureMatrix): The features of the data frame, to check the policy against in trusted mode.
+        rows (ndarray of int): The positions of the rows to check (all of them if not given).
+    Returns:
+        ndarray of bool: The compliance mask of the rows checked, or none if filtration failed completely.
+    """
+    checked = df if rows is None else df.iloc[rows]
+    retries = 0
+    while retries <= FILT_RUN_RETRIES: # We might need to retry this several times.
+        try:
+            if definition is not None:
+                # Pure Python policy filtration, using precomputed features if there are any.
+                return policy_mask(checked, definition) if features is None else features.mask(definition, rows=rows)
+            # Filter using an application extracted from Coq.
+            auth = DaemonAuthority(authority, policy) if daemon else Authority(authority, policy)
+            if cached:
+                auth = CachedAuthority(auth)
+            try:
+                return authority_mask(checked, auth)
+            finally:
+                auth.terminate()
+        except AuthorityError:
+            print(f'Authority filtration process died. Retrying (attempt {retries + 1} of {FILT_RUN_RETRIES})...')
+            time.sleep(backoff_delay(retries + 1)) # Wait, GC might need to run or something.
+        retries += 1
+    return None
+
+
+def filter_cell (file, policy, authority, definition, cached=True, daemon=False, *parents):
+    """ Filters a file by a policy, as a task in a sweep.
+
+    Only the compliance mask is kept, as it's much cheaper to pass between processes than the filtered data frame.
+    Given the results of filtering by weaker policies (see `policy_parents`), only passwords that survived all of them
+    are checked, and surplus probability is found by subtracting what survives from the total.
+
+    Args:
+        file (str): The path of the CSV file to filter.
+        policy (str): The name of the policy to filter by.
+        authority (str): The authority binary to use for filtration (ignored in trusted mode).
+        definition (Policy): The policy for pure Python filtration (trusted mode), or none to use the authority.
+        cached (bool): Whether or not to check the verdict cache before asking the authority.
+        daemon (bool): Whether or not to ask a shared authority daemon, rather than launching the authority.
+        *parents (pair): The results of filtering the file by policies this one implies (see `filter_cell`).
+    Returns:
+        pair: The filtration result without its data frame and the compliance mask, in a pair, or none if filtration
+            failed completely.
+    """
+    df = cached_distribution(file)
+    features = None if definition is None else cached_features(file)
+    parents = [parent for parent in parents if parent is not None] # Failed parents narrow nothing down.
+    if not parents:
+        mask = run_filtration(df, policy, authority, definition, cached, daemon, features)
+        if mask is None:
+            return None
+        filtration = filter_mask(df, mask)
+        return Filtration(filtration.total, filtration.surplus, None, filtration.count, filtration.top), mask
+    # Check only passwords every weaker policy let through, as no others can comply.
+    rows = np.flatnonzero(np.logical_and.reduce([parent[1] for parent in parents]))
+    checked = run_filtration(df, policy, authority, definition, cached, daemon, features, rows)
+    if checked is None:
+        return None
+    mask = np.zeros(len(df.index), dtype=bool)
+    mask[rows[checked]] = True
+    # Only survivors need summing, the total is the same as for any parent.
+    kept = df['probability'].to_numpy()[rows[checked]]
+    total = parents[0][0].total
+    return Filtration(total, total - kept.sum(), None, len(kept), kept.max() if len(kept) > 0 else None), mask
+
+
+def reselect_cell (file, policy, mode, out, materialise, filtered):
+    """ Reselects a filtered file in a mode, writing reselected data, guessing projection and fitted equation, as a
+    task in a sweep.
+
+    Args:
+        file (str): The path of the CSV file that was filtered.
+        policy (str): The name of the policy it was filtered by.
+        mode (str): The reselection mode to use.
+        out (str): The directory in which to place output.
+        materialise (bool): Whether or not to write out literal passwords in place of rows standing for many.
+        filtered (pair): The result of the filtration task (see `filter_cell`).
+    Returns:
+        list of str: The paths of the files written (none if everything was filtered), or none if filtration failed.
+    """
+    if filtered is None:
+        return None
+    if filtered[0].is_empty():
+        return []
+    filtration = filter_mask(cached_distribution(file), filtered[1])
+    outputs = [compute_out_path(out, file, policy, mode, ext) for ext in ['csv', 'log', 'json']]
+    # Reselect from the filtration result, lazily if the mode declares a transform.
+    resel, transform = write_reselected(mode, filtration, outputs[0], materialise)
+    # Run optimal attack projection, sampling at percentiles.
+    with open(outputs[1], 'w', encoding='utf-8') as log_file:
+        for point in guess_optimally(resel, True, transform):
+            print(point, file=log_file)
+    # Fit equation to altered distribution.
+    with open(outputs[2], 'w') as eq_file:
+        print(json.dumps(fit_powerlaw(*rank_values(resel, transform=transform))), file=eq_file)
+    return outputs
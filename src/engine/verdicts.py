@@ -0,0 +1,187 @@
+import os
+import sys
+import sqlite3
+
+from engine import distcache
+
+
+# The name of the verdict cache database, kept in the cache directory next to the authority binary.
+VERDICT_CACHE_NAME = 'verdicts.sqlite'
+
+# The number of seconds to wait for other processes writing to the verdict cache.
+VERDICT_CACHE_TIMEOUT = 60
+
+
+def verdict_cache_path (file):
+    """ Computes the path of the verdict cache for an authority binary.
+
+    Args:
+        file (str): The path of the authority binary.
+    Returns:
+        str: The path of the verdict cache database.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(file)), distcache.CACHE_DIR_NAME, VERDICT_CACHE_NAME)
+
+
+class VerdictCache:
+    """ Represents an on-disk cache of authority verdicts, keyed by authority binary hash, policy name and password.
+
+    Verdicts are cached as the authority gives them, before any inversion.
+    """
+
+    def __init__ (self, file, policy, path=None):
+        """ Opens the verdict cache for an authority binary and policy, creating it if necessary.
+
+        Args:
+            file (str): The path of the authority binary.
+            policy (str): The name of the policy.
+            path (str): The path of the cache database (see `verdict_cache_path` if not given).
+        """
+        self.auth = distcache.hash_file(file)
+        self.policy = policy
+        self.path = verdict_cache_path(file) if path is None else path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=VERDICT_CACHE_TIMEOUT)
+        self.conn.execute('PRAGMA journal_mode=WAL') # Let sweep workers read while another writes.
+        self.conn.execute('CREATE TABLE IF NOT EXISTS verdicts (auth TEXT, policy TEXT, password TEXT, verdict INTEGER, '
+            'PRIMARY KEY (auth, policy, password)) WITHOUT ROWID')
+        self.conn.commit()
+
+    def lookup (self, pwds):
+        """ Looks up cached verdicts for a list of passwords.
+
+        Args:
+            pwds (list of str): The passwords to look up.
+        Returns:
+            list of bool: The cached verdict for each password, or none where there isn't one.
+        """
+        # Joining against a temporary table is much faster than a query per password.
+        self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS lookup (i INTEGER PRIMARY KEY, password TEXT)')
+        self.conn.execute('DELETE FROM lookup')
+        self.conn.executemany('INSERT INTO lookup VALUES (?, ?)', enumerate(pwds))
+        verdicts = [None] * len(pwds)
+        rows = self.conn.execute('SELECT lookup.i, verdicts.verdict FROM lookup JOIN verdicts ON verdicts.auth = ? '
+            'AND verdicts.policy = ? AND verdicts.password = lookup.password', (self.auth, self.policy))
+        for i, verdict in rows:
+            verdicts[i] = bool(verdict)
+        self.conn.execute('DELETE FROM lookup')
+        self.conn.commit() # Don't hold on to a read snapshot, or storing verdicts later can fail to get the lock.
+        return verdicts
+
+    def store (self, pwds, verdicts):
+        """ Stores verdicts for a list of passwords.
+
+        Args:
+            pwds (list of str): The passwords.
+            verdicts (list of bool): The verdict for each password.
+        """
+        self.conn.executemany('INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?)',
+            ((self.auth, self.policy, pwd, int(verdict)) for pwd, verdict in zip(pwds, verdicts)))
+        self.conn.commit()
+
+    def close (self):
+        """ Closes the verdict cache.
+        """
+        self.conn.close()
+
+
+class CachedAuthority:
+    """ Represents an authority (or pool of them) fronted by a verdict cache, so that only cache misses are asked.
+
+    Exposes the same interface as `Authority`, so either can be used for filtration.
+    """
+
+    def __init__ (self, authority, path=None):
+        """ Constructs a new verdict cache in front of an authority.
+
+        If the cache can't be opened (for example, because the directory it's kept in isn't writable), every password
+        is asked of the authority as usual.
+
+        Args:
+            authority (Authority): The authority (or pool of them) to ask on cache misses.
+            path (str): The path of the cache database (see `verdict_cache_path` if not given).
+        """
+        self.authority = authority
+        self.file = authority.file
+        self.policy = authority.policy
+        try:
+            self.cache = VerdictCache(authority.file, authority.policy, path)
+        except (OSError, sqlite3.Error) as err:
+            print(f'Could not open verdict cache ({err}), asking the authority about every password.', file=sys.stderr)
+            self.cache = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def launch_times (self):
+        """ Gets the seconds taken by each successful launch of the authority.
+
+        Returns:
+            list of float: The launch times.
+        """
+        return self.authority.launch_times
+
+    def try_launch (self):
+        """ Attempts to launch the authority.
+
+        Returns:
+            bool: True if the authority launched successfully, otherwise false.
+        """
+        return self.authority.try_launch()
+
+    def ask (self, pwd):
+        """ Checks with the cache, then the authority, whether or not a password is permitted.
+
+        Args:
+            pwd (str): The password to check.
+        Returns:
+            bool: True if the password is permitted, otherwise False.
+        """
+        return self.ask_many([pwd])[0]
+
+    def ask_many (self, pwds):
+        """ Checks with the cache, then the authority, whether or not each of a list of passwords is permitted.
+
+        Args:
+            pwds (list of str): The passwords to check.
+        Returns:
+            list of bool: True for each password that is permitted, otherwise False.
+        """
+        if self.cache is None:
+            return self.authority.ask_many(pwds)
+        try:
+            verdicts = self.cache.lookup(pwds)
+        except sqlite3.Error as err:
+            print(f'Could not look up verdicts in cache ({err}), asking the authority about every password.', file=sys.stderr)
+            self.close_cache()
+            return self.authority.ask_many(pwds)
+        missed = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        self.hits += len(pwds) - len(missed)
+        self.misses += len(missed)
+        if missed:
+            # Only cache misses go to the authority.
+            misses = [pwds[i] for i in missed]
+            answers = self.authority.ask_many(misses)
+            try:
+                self.cache.store(misses, answers)
+            except sqlite3.Error as err:
+                print(f'Could not store verdicts in cache ({err}), carrying on without them.', file=sys.stderr)
+            for i, answer in zip(missed, answers):
+                verdicts[i] = answer
+        return verdicts
+
+    def terminate (self):
+        """ Gets rid of the authority, and closes the cache.
+        """
+        self.authority.terminate()
+        self.close_cache()
+
+    def close_cache (self):
+        """ Closes the cache, if it's open, so that every password is asked of the authority from now on.
+        """
+        if self.cache is not None:
+            try:
+                self.cache.close()
+            except sqlite3.Error:
+                pass # Nothing more to do with it anyway.
+            self.cache = None
@@ -0,0 +1,31 @@
+class Filtration:
+    """ Represents the result of filtering a password probability distribution by a policy.
+    """
+
+    def __init__ (self, total, surplus, df, count=None, top=None):
+        """ Constructs a new instance of a filtration result.
+
+        Args:
+            total (float): The total probability before filtration (should be approximately equal to 1).
+            surplus (float): The probability of all filtered-out passwords.
+            df (DataFrame): The filtered data frame, sorted by probability, or none if it was streamed to disk.
+            count (int): The number of passwords left (taken from the data frame if not given).
+            top (float): The highest probability left (taken from the data frame if not given).
+        """
+        self.total = total
+        self.surplus = surplus
+        self.df = df
+        self.count = len(df.index) if count is None else count
+        if top is None and self.count > 0:
+            top = df['probability'].max()
+        self.top = top
+
+    def is_empty (self):
+        """ Returns true if every password was filtered out, otherwise false.
+
+        Passwords are counted rather than probability summed, which rounding could leave short of zero.
+
+        Returns:
+            bool: True if there is nowhere to redistribute probability to, otherwise false.
+        """
+        return self.count == 0
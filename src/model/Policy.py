@@ -0,0 +1,197 @@
+import os
+import json
+
+import pandas as pd
+
+from composition.charclass import analyse, dict_normalise
+from composition.pindates import is_date
+from composition.policy import parse_spec
+from composition.vectorized import complies_mask
+
+from shared.args import get_valued_arg, get_int_valued_arg, is_arg_passed
+
+
+# The file defining named policies for trusted mode.
+POLICY_FILE = './policies.json'
+
+# The character feature thresholds a policy can set, as named by `complies`.
+THRESHOLDS = ['length', 'lowers', 'uppers', 'digits', 'others', 'letters', 'classes', 'words']
+
+# Flags used by `policyfilt.py` for each threshold.
+THRESHOLD_FLAGS = {'length': 'n', 'lowers': 'l', 'uppers': 'u', 'digits': 'd', 'others': 's', 'letters': 'a',
+    'classes': 'c', 'words': 'w'}
+
+# Special additional requirements that `policyfilt.py` takes as flags of the same name.
+SPEC_FLAGS = ['norep', 'noconsec', 'nodate']
+
+# Maps thresholds to the `Features` fields they are checked against.
+THRESHOLD_FEATURES = {'length': 'length', 'lowers': 'lowers', 'uppers': 'uppers', 'digits': 'digits',
+    'others': 'symbols', 'letters': 'letters', 'classes': 'classes', 'words': 'words'}
+
+
+class Policy:
+    """ Represents a trusted-mode password composition policy.
+    """
+
+    def __init__ (self, name=None, spec=[], **thresholds):
+        """ Constructs a new instance of a policy.
+
+        Args:
+            name (str): The name of the policy, if it has one.
+            spec (list of str): Any special additional requirements (see `complies`).
+            **thresholds (int): Minimums for any of the features in `THRESHOLDS`, 0 if not given.
+        """
+        self.name = name
+        self.spec = list(spec)
+        for threshold in THRESHOLDS:
+            setattr(self, threshold, thresholds.pop(threshold, 0) or 0)
+        if thresholds:
+            raise ValueError(f'Unknown policy requirement(s): {", ".join(thresholds)}')
+        self.checker = None # Compiled on first use.
+
+    def kwargs (self):
+        """ Gets the policy as keyword arguments for `complies`.
+
+        Returns:
+            dict: The keyword arguments.
+        """
+        kwargs = {threshold: getattr(self, threshold) for threshold in THRESHOLDS}
+        kwargs['spec'] = self.spec
+        return kwargs
+
+    def compile (self):
+        """ Compiles the policy into a checker that runs only the predicates the policy needs, cheapest first.
+
+        Returns:
+            function: A function taking a string, returning true if it complies with the policy, otherwise false.
+        """
+        predicates = []
+        if self.length > 0:
+            predicates.append(lambda val: len(val) >= self.length)
+        reqs = parse_spec(tuple(self.spec))
+        names = [req for req, dict in reqs]
+        if 'nodate' in names:
+            predicates.append(lambda val: not is_date(val))
+        # Every other character feature comes from a single pass over the string.
+        minimums = [(THRESHOLD_FEATURES[threshold], getattr(self, threshold)) for threshold in THRESHOLDS[1:]
+            if getattr(self, threshold) > 0]
+        forbidden = [field for req, field in [('norep', 'has_rep'), ('noconsec', 'has_consec')] if req in names]
+        if minimums or forbidden:
+            def check_features (val):
+                features = analyse(val)
+                return (all(getattr(features, field) >= min for field, min in minimums) and
+                    not any(getattr(features, field) for field in forbidden))
+            predicates.append(check_features)
+        for req, dict in reqs:
+            if req == 'dict':
+                predicates.append(lambda val, dict=dict: not dict_normalise(val) in dict)
+        return lambda val: all(predicate(val) for predicate in predicates)
+
+    def complies (self, val, invert=False):
+        """ Checks whether or not a string complies with the policy.
+
+        Args:
+            val (str): The string to check.
+            invert (bool): Whether to not to invert the policy.
+        Returns:
+            bool: True if the string is compliant, otherwise false.
+        """
+        if self.checker is None:
+            self.checker = self.compile()
+        return invert ^ self.checker(val)
+
+    def mask (self, pwds, invert=False):
+        """ Checks whether or not each of a series of strings complies with the policy.
+
+        Only strings that pass the length requirement are checked any further.
+
+        Args:
+            pwds (Series of str): The strings to check.
+            invert (bool): Whether to not to invert the policy.
+        Returns:
+            ndarray of bool: True for each string that is compliant, otherwise false.
+        """
+        pwds = pd.Series(pwds, dtype=object).reset_index(drop=True)
+        out = pwds.str.len().to_numpy() >= self.length
+        kwargs = self.kwargs()
+        kwargs['length'] = 0
+        out[out] = complies_mask(pwds[out], **kwargs)
+        return invert ^ out
+
+    def implies (self, other):
+        """ Checks whether or not every string that complies with this policy also complies with another.
+
+        This holds if every minimum is at least the other's and every special additional requirement of the other is
+        also one of this policy's. Policies that imply each other in less obvious ways aren't detected.
+
+        Args:
+            other (Policy): The other policy.
+        Returns:
+            bool: True if this policy is at least as strict as the other, otherwise false.
+        """
+        return (all(getattr(self, threshold) >= getattr(other, threshold) for threshold in THRESHOLDS) and
+            set(other.spec) <= set(self.spec))
+
+    def to_dict (self):
+        """ Serializes the policy to a definition, as understood by `from_dict`.
+
+        Returns:
+            dict: The policy definition.
+        """
+        raw = {threshold: getattr(self, threshold) for threshold in THRESHOLDS if getattr(self, threshold) > 0}
+        if self.spec:
+            raw['spec'] = self.spec
+        return raw
+
+    @staticmethod
+    def from_dict (raw, name=None):
+        """ Creates a policy from a definition.
+
+        A definition maps thresholds (see `THRESHOLDS`) to minimums and may list special additional requirements
+        under `spec`. For convenience, `dict` may give a dictionary file directly.
+
+        Args:
+            raw (dict): The policy definition.
+            name (str): The name of the policy, if it has one.
+        Returns:
+            Policy: The policy.
+        """
+        raw = dict(raw)
+        spec = list(raw.pop('spec', []))
+        if 'dict' in raw:
+            spec.append('dict:' + raw.pop('dict'))
+        return Policy(name, spec, **raw)
+
+    @staticmethod
+    def from_flags (argv=None, name=None):
+        """ Creates a policy from `policyfilt.py`-style flags.
+
+        Args:
+            argv (list of str): The flags to read (`sys.argv` by default).
+            name (str): The name of the policy, if it has one.
+        Returns:
+            Policy: The policy.
+        """
+        thresholds = {threshold: get_int_valued_arg(flag, argv) for threshold, flag in THRESHOLD_FLAGS.items()}
+        spec = [req for req in SPEC_FLAGS if is_arg_passed(req, argv)]
+        dict = get_valued_arg('dict', argv)
+        return Policy(name, spec if dict is None else spec + ['dict:' + dict], **thresholds)
+
+    @staticmethod
+    def load (file):
+        """ Loads named policy definitions from a JSON or YAML file.
+
+        YAML files (`.yaml` or `.yml`) require PyYAML to be installed.
+
+        Args:
+            file (str): The filepath from which to load the policies.
+        Returns:
+            dict: The loaded policies, keyed by name.
+        """
+        with open(file) as f:
+            if os.path.splitext(file)[1].lower() in ['.yaml', '.yml']:
+                import yaml # Optional dependency, only needed for YAML policy files.
+                raw = yaml.safe_load(f)
+            else:
+                raw = json.load(f)
+        return {name: Policy.from_dict(definition, name) for name, definition in raw.items()}
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+class Transform:
+    """ Represents a reselection mode declared symbolically, so that it can be applied lazily.
+
+    Every probability `p` becomes `p / divisor + offset`, and the single most probable password additionally gains
+    `top_delta`. Ordering by probability is preserved, so a sorted distribution stays sorted.
+    """
+
+    def __init__ (self, divisor=1.0, offset=0.0, top_delta=0.0):
+        """ Constructs a new instance of a reselection transform.
+
+        Args:
+            divisor (float): The amount by which to divide every probability (must be positive).
+            offset (float): The amount to add to every probability.
+            top_delta (float): The amount to add to the probability of the most probable password only.
+        """
+        self.divisor = divisor
+        self.offset = offset
+        self.top_delta = top_delta
+
+    def apply (self, probs, top=None):
+        """ Applies the transform to probabilities, returning new ones.
+
+        Args:
+            probs (ndarray of float): The probabilities.
+            top (int): The position of the most probable password among them, if it's there at all.
+        Returns:
+            ndarray of float: The transformed probabilities.
+        """
+        out = np.asarray(probs, dtype=float) / self.divisor + self.offset
+        if top is not None and len(out) > 0:
+            out[top] += self.top_delta
+        return out
+
+    def apply_chunk (self, chunk, start, top):
+        """ Applies the transform to one chunk of a distribution streamed in file order, in place.
+
+        Args:
+            chunk (DataFrame): The chunk.
+            start (int): The position of the chunk's first row in the whole distribution.
+            top (int): The position of the most probable password in the whole distribution.
+        Returns:
+            DataFrame: The transformed chunk.
+        """
+        index = top - start if start <= top < start + len(chunk.index) else None
+        chunk['probability'] = self.apply(chunk['probability'].to_numpy(dtype=float), index)
+        return chunk
+
+    def apply_cumulative (self, curve, guesses=None):
+        """ Applies the transform to the cumulative probabilities of an optimal guessing attack.
+
+        Args:
+            curve (ndarray of float): The cumulative probability of a sorted distribution after each number of guesses.
+            guesses (ndarray of int): The number of guesses for each cumulative probability (0, 1, ..., n if none).
+        Returns:
+            ndarray of float: The transformed cumulative probabilities.
+        """
+        guesses = np.arange(len(curve)) if guesses is None else np.asarray(guesses)
+        return np.asarray(curve) / self.divisor + guesses * self.offset + np.where(guesses > 0, self.top_delta, 0.0)
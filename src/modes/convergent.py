@@ -1,4 +1,20 @@
-import pandas as pd
+import numpy as np
+
+from model.Transform import Transform
+
+
+def transform (total, surplus, count):
+    """ Declares convergent reselection on a password probability distribution.
+
+    Args:
+        total (float): The total probability (should be approximately equal to 1).
+        surplus (float): The surplus probability (should be less than or equal to `total`).
+        count (int): The number of passwords in the distribution.
+    Returns:
+        Transform: The reselection, as a transform to be applied lazily.
+    """
+    # Convergent reselection, all surplus goes to the most probable password.
+    return Transform(top_delta=surplus)
 
 
 def reselect (total, surplus, df):
@@ -9,6 +25,7 @@ def reselect (total, surplus, df):
         surplus (float): The surplus probability (should be less than or equal to `total`).
         df (DataFrame): The data frame containing the target field.
     """
-    # Convergent reselection.
-    df.loc[0, 'probability'] += surplus
+    # Find the most probable password whether or not the data frame is sorted.
+    probs = df['probability'].to_numpy(dtype=float)
+    df['probability'] = transform(total, surplus, len(df.index)).apply(probs, int(np.argmax(probs)))
     return df
@@ -1,9 +1,19 @@
 from math import floor
+import numpy as np
 import pandas as pd
 
 import string
 import random
 
+from engine.blocks import COUNT_COLUMN
+
+
+# The length of random passwords generated outside the set.
+RAND_PASS_LENGTH = 16
+
+# The characters random passwords are made of.
+RAND_PASS_ALPHABET = string.ascii_letters + string.digits + string.punctuation
+
 
 def gen_rand_pass (len):
     """ Generates a random password.
@@ -15,13 +25,31 @@ def gen_rand_pass (len):
     Returns:
         str: The generated password
     """
-    alpha = string.ascii_letters + string.digits + string.punctuation
-    return ''.join(random.choice(alpha) for i in range(len))
+    return ''.join(random.choice(RAND_PASS_ALPHABET) for i in range(len))
+
+
+def gen_rand_passes (count, length):
+    """ Generates a number of random passwords at once.
+
+    Note that these passwords are not subject to a password composition policy.
+
+    Args:
+        count (int): The number of passwords to generate.
+        length (int): The length of the passwords to generate.
+    Returns:
+        ndarray of str: The generated passwords.
+    """
+    chars = np.array(list(RAND_PASS_ALPHABET))
+    picks = chars[np.random.default_rng().integers(0, len(RAND_PASS_ALPHABET), size=(count, length))]
+    return np.ascontiguousarray(picks).view(f'<U{length}').ravel()
 
 
 def reselect (total, surplus, df):
     """ Models extraneous reselection on a password probability distribution.
 
+    Rather than generating the extra passwords themselves, they're added as a single row with a count (see
+    `engine.blocks`), which guessing and fitting understand. Use `materialise` to generate them.
+
     Args:
         total (float): The total probability (should be approximately equal to 1).
         surplus (float): The surplus probability (should be less than or equal to `total`).
@@ -30,7 +58,23 @@ def reselect (total, surplus, df):
     # Extraneous reselection.
     single = df['probability'].min()
     extra_recs = floor(surplus / single)
-    pwds = [gen_rand_pass(16) for i in range(0, extra_recs)]
-    probabilities = [single for i in range(0, extra_recs)]
-    df = df.append(pd.DataFrame({"password": pwds, "probability": probabilities}))
-    return df
+    if extra_recs == 0:
+        return df
+    block = pd.DataFrame({'password': [None], 'probability': [single], COUNT_COLUMN: pd.array([extra_recs], dtype='Int64')})
+    return pd.concat([df, block])
+
+
+def materialise (df):
+    """ Replaces the row standing for the extra passwords with that many random passwords.
+
+    Args:
+        df (DataFrame): The data frame, as returned by `reselect`.
+    Returns:
+        DataFrame: The data frame with every password listed literally.
+    """
+    if not COUNT_COLUMN in df.columns:
+        return df
+    blocks = df[COUNT_COLUMN].notna()
+    extra = [pd.DataFrame({'password': gen_rand_passes(int(row[COUNT_COLUMN]), RAND_PASS_LENGTH),
+        'probability': row['probability']}) for _, row in df[blocks].iterrows()]
+    return pd.concat([df[~blocks].drop(columns=[COUNT_COLUMN])] + extra)
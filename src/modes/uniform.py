@@ -1,4 +1,18 @@
-import pandas as pd
+from model.Transform import Transform
+
+
+def transform (total, surplus, count):
+    """ Declares uniform reselection on a password probability distribution.
+
+    Args:
+        total (float): The total probability (should be approximately equal to 1).
+        surplus (float): The surplus probability (should be less than or equal to `total`).
+        count (int): The number of passwords in the distribution.
+    Returns:
+        Transform: The reselection, as a transform to be applied lazily.
+    """
+    # Uniform reselection.
+    return Transform(offset=surplus / count)
 
 
 def reselect (total, surplus, df):
@@ -9,7 +23,5 @@ def reselect (total, surplus, df):
         surplus (float): The surplus probability (should be less than or equal to `total`).
         df (DataFrame): The data frame containing the target field.
     """
-    # Uniform reselection.
-    ech = surplus / len(df.index)
-    df['probability'] += ech
+    df['probability'] = transform(total, surplus, len(df.index)).apply(df['probability'])
     return df
@@ -1,20 +1,16 @@
 import sys
 import os
-import math
-import pandas as pd
-
-from shared.fileloading import load_file_lines
-from shared.args import get_valued_arg, is_arg_passed, split_multi_arg
 
+from engine.distribution import load_distribution
+from engine.guessing import guess_optimally, success_rates, alpha_guesswork, guessing_entropy
 
-# Obviously, percentile means a 100th.
-PERCENTILE_DENOM = 100
+from shared.args import get_valued_arg, is_arg_passed, split_multi_arg
 
 
 def print_usage (show_help_line=False):
     """ Prints the short help card for the program.
     """
-    print('Usage: python optimalguess.py [-hc] [-o <outfile>] <targetfile>')
+    print('Usage: python optimalguess.py [-hcg] [-b <budgets>] [-a <alphas>] [-o <outfile>] <targetfile>')
     print('Guesses passwords in a dataset optimally.')
     if show_help_line:
         print('For extended help use \'-h\' option.')
@@ -29,7 +25,12 @@ def print_help ():
     print('Options:')
     print('\t-h: Show this help screen')
     print('\t-c: Output 100 cumulative probabilities only (percentile mode)')
+    print('\t-b <str>: Output the success rate within each of these numbers of guesses instead [1]')
+    print('\t-a <str>: Output the α-guesswork for each of these success rates instead [1]')
+    print('\t-g: Output the guessing entropy (G-value) instead')
     print('\t-o <path>: Output to file instead of stdout')
+    print('Notes:')
+    print('\t[1]: Separate multiple values with \';\', e.g. \'10;100;1000\'. Output is one \'<value>, <result>\' line per value.')
 
 
 # If no options specified, print usage and exit.
@@ -61,27 +62,22 @@ output_file_path = get_valued_arg('o')
 if not output_file_path is None:
     output_stream = open(output_file_path, 'w', encoding='utf-8')
 
-# Read data frame from file.
-df = pd.read_csv(file, skipinitialspace=True, skip_blank_lines=True)
-
-# Sort by probability.
-df.sort_values(by=['probability'], ascending=False, inplace=True)
-df.reset_index(drop=True, inplace=True)
-
-# How many rows total?
-entries = len(df.index)
-
-# Keep track of cumulative probability.
-cumulative = 0
-
-# Sampling interval.
-interval = math.floor(entries / PERCENTILE_DENOM) if perc_mode else 1
-
-# Print cumulative probability/frequency.
-points = 0
-for index, row in df.iterrows():
-    if index % interval == 0 and points < PERCENTILE_DENOM - 1: # Don't collect too many data points.
-        print(cumulative, file=output_stream)
-        points += 1
-    cumulative += row['probability']
-print(cumulative, file=output_stream)
+# Read data frame from file, percentile mode doesn't need it sorted (but guesswork metrics do).
+metric_requested = is_arg_passed('b') or is_arg_passed('a') or is_arg_passed('g')
+df = load_distribution(file, sort=not perc_mode or metric_requested)
+
+# Print guesswork metrics if asked for any.
+if is_arg_passed('b'):
+    budgets = list(map(int, split_multi_arg(get_valued_arg('b'))))
+    for budget, rate in zip(budgets, success_rates(df, budgets)):
+        print(f'{budget}, {rate}', file=output_stream)
+elif is_arg_passed('a'):
+    alphas = list(map(float, split_multi_arg(get_valued_arg('a'))))
+    for alpha, guesswork in zip(alphas, alpha_guesswork(df, alphas)):
+        print(f'{alpha}, {guesswork}', file=output_stream)
+elif is_arg_passed('g'):
+    print(guessing_entropy(df), file=output_stream)
+else:
+    # Print cumulative probability/frequency.
+    for point in guess_optimally(df, perc_mode):
+        print(point, file=output_stream)
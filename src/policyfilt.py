@@ -1,12 +1,13 @@
 import sys
 import os
-import numpy as np
-import pandas as pd
 
-from composition.policy import complies
+from engine.distribution import load_distribution
+from engine.filtration import filter_policy
+from engine.reselection import write_reselected
+from engine.streaming import filter_streaming
 
 from shared.args import get_valued_arg, is_arg_passed, get_int_valued_arg
-from shared.moduleloading import load_resel_mode
+from model.Policy import Policy, POLICY_FILE
 
 
 def print_usage (show_help_line=False):
@@ -14,7 +15,7 @@ def print_usage (show_help_line=False):
     Args:
         show_help_line (bool): If true, information on help flag `-h` will be printed.
     """
-    print('Usage: python policyfilt.py [-hi] [-nludsacw <min>] [-m <renorm_mode>] [-o <outfile>] <infile>')
+    print('Usage: python policyfilt.py [-hi] [-p <policy>] [-nludsacw <min>] [-dict <dictfile>] [-norep] [-noconsec] [-nodate] [-m <renorm_mode>] [-chunk <rows>] [-x] [-o <outfile>] <infile>')
     print('Filters a CSV file of password probabilities according to a policy and redistributes filtered probabilities according to a reselection mode.')
     if show_help_line:
         print('For extended help use \'-h\' option.')
@@ -28,6 +29,7 @@ def print_help ():
     print('\tinfile: The password file to filter')
     print('Options:')
     print('\t-h: Show this help screen')
+    print('\t-p <str>: Use a named policy from \'' + POLICY_FILE + '\' instead of the flags below')
     print('\t-n <int>: Passwords shorter than <min> characters long will be removed')
     print('\t-l <int>: Passwords with fewer than <min> lowercase letters will be removed')
     print('\t-u <int>: Passwords with fewer than <min> uppercase letters will be removed')
@@ -36,8 +38,14 @@ def print_help ():
     print('\t-a <int>: Passwords with fewer than <min> letters will be removed')
     print('\t-c <int>: Passwords with fewer than <min> character classes (LUDS) will be removed')
     print('\t-w <int>: Passwords with fewer than <min> words (letter sequences) will be removed')
+    print('\t-dict <str>: Passwords in this dictionary file (after converting to lowercase and removing non-letters) will be removed')
+    print('\t-norep: Passwords with the same character twice in a row will be removed')
+    print('\t-noconsec: Passwords with adjacent characters one codepoint apart (e.g. \'ab\', \'21\') will be removed')
+    print('\t-nodate: Passwords that are 6-digit numbers that look like dates will be removed')
     print('\t-m <int>: Choose a probability redistribution mode [1]')
     print('\t-i: Invert policy (filter all accepted, output only rejected)')
+    print('\t-chunk <int>: Stream the input this many rows at a time instead of loading it into memory [2]')
+    print('\t-x: Write out every password literally, even where the reselection mode adds many at once [3]')
     print('\t-o <str>: The file in which to place output')
     print('Notes:')
     print('\t[1]: Bundled redistribution modes include:')
@@ -47,6 +55,10 @@ def print_help ():
     print('\t\tconvergent: Convergent reselection mode, places probability from all eliminated outcomes into most frequent outcome')
     print('\t\textraneous: Extraneous reselection mode, uniformly redistributes probability of eliminated outcomes to random passwords outside the set')
     print('\t\custom: You may add your own reselection modes as Python files in the `./modes` folder')
+    print('\t[2]: Streamed output keeps the input order, and modes that don\'t declare a transform (such as extraneous)')
+    print('\t\tstill need every compliant row in memory at once')
+    print('\t[3]: Extraneous mode otherwise adds a single row with an extra `count` column, standing for that many random')
+    print('\t\tpasswords with the same probability, which optimalguess.py and zipf.py understand')
     print()
     print('Input file should be in CSV format:')
     print('\tpassword, probability, ... <- Column headers')
@@ -78,17 +90,12 @@ if not os.path.isfile(file):
     sys.exit(1)
 
 # Try to read in policy from arguments.
-length = get_int_valued_arg('n')
-lowers = get_int_valued_arg('l')
-uppers = get_int_valued_arg('u')
-digits = get_int_valued_arg('d')
-symbols = get_int_valued_arg('s')
-letters = get_int_valued_arg('a')
-classes = get_int_valued_arg('c')
-words = get_int_valued_arg('w')
+if is_arg_passed('p'):
+    policies = Policy.load(POLICY_FILE)
+    policy = policies[get_valued_arg('p')]
+else:
+    policy = Policy.from_flags()
 invert = is_arg_passed('i')
-dict = get_valued_arg('dict')
-extras = []
 
 # Get redistribution mode.
 resel_mode = None if not is_arg_passed('m') else get_valued_arg('m')
@@ -96,51 +103,22 @@ resel_mode = None if not is_arg_passed('m') else get_valued_arg('m')
 # Get output path if one was specified.
 out = get_valued_arg('o')
 
-# TODO: No support for special requirements yet.
-
-# Default values.
-if length is None:
-    length = 0
-if lowers is None:
-    lowers = 0
-if uppers is None:
-    uppers = 0
-if digits is None:
-    digits = 0
-if symbols is None:
-    symbols = 0
-if letters is None:
-    letters = 0
-if classes is None:
-    classes = 0
-if words is None:
-    words = 0
-if dict is not None:
-    extras += ["dict:" + dict]
-
-# Read data frame from file.
-df = pd.read_csv(file, skipinitialspace=True, skip_blank_lines=True)
-
-# Sort by probability and reset index.
-df.sort_values(by=['probability'], ascending=False, inplace=True)
-df.reset_index(drop=True, inplace=True)
-
-# Get total probability.
-total_prob = df['probability'].sum()
-
-# Filter passwords and reset index again.
-df = df[df.apply(lambda x: complies(str(x['password']), length, lowers, uppers, digits, symbols, letters, classes, words, extras, invert), axis=1)]
-df.reset_index(drop=True, inplace=True)
-
-# Get 'surplus' probability.
-filtered_prob = df['probability'].sum()
-surplus = total_prob - filtered_prob
-row_count = len(df.index)
-
-# Different reselection modes.
-if resel_mode != None:
-    reselector = load_resel_mode(resel_mode)
-    df = reselector.reselect(total_prob, surplus, df)
-
-# Print data frame.
-df.to_csv(out if not out is None else sys.stdout, index=False)
+# Get chunk size if streaming.
+chunksize = get_int_valued_arg('chunk')
+
+# Write out literal passwords in place of rows standing for many?
+materialise = is_arg_passed('x')
+
+# Stream through the file if asked to, writing output as we go.
+if chunksize is not None:
+    filter_streaming(file, lambda chunk: policy.mask(chunk['password'].map(str), invert), out, resel_mode, chunksize, materialise)
+    exit(0)
+
+# Read data frame from file, sorted by probability.
+df = load_distribution(file)
+
+# Filter passwords.
+filtration = filter_policy(df, policy, invert)
+
+# Reselect according to mode, printing the result as we go.
+write_reselected(resel_mode, filtration, out if not out is None else sys.stdout, materialise)
@@ -1,9 +1,13 @@
 import sys
 import os
-import time
-import subprocess
 
-from shared.args import is_arg_passed
+from engine.scheduler import Scheduler
+from engine.sweep import filter_cell, reselect_cell
+from engine.lattice import policy_parents, lattice_order, nearest_parents
+from engine.manifest import Manifest, MANIFEST_FILE_NAME, TOOL_VERSION, digest, file_digest, policy_digest, mode_digest
+
+from shared.args import get_valued_arg, get_int_valued_arg, is_arg_passed
+from model.Policy import Policy, POLICY_FILE
 from model.Task import Task
 
 
@@ -12,7 +16,7 @@ def print_usage (show_help_line=False):
     Args:
         show_help_line (bool): If true, information on help flag `-h` will be printed.
     """
-    print('Usage: python [-h] pyrrho.py <taskfile>')
+    print('Usage: python [-htxfdl] pyrrho.py [-p <policyfile>] [-j <jobs>] [-nocache] <taskfile>')
     print('Interprets a task file containing instructions for password probability distribution transformation.')
     if show_help_line:
         print('For extended help use \'-h\' option.')
@@ -26,6 +30,13 @@ def print_help ():
     print('\ttaskfile: The task file to run (see README.md)')
     print('Options:')
     print('\t-t: Trusted mode [1]')
+    print('\t-p <str>: A JSON or YAML file of extra policy definitions for trusted mode [2]')
+    print('\t-x: Write out every password literally, even where the reselection mode adds many at once [3]')
+    print('\t-j <int>: Run this many filtration and reselection tasks at once [4]')
+    print('\t-f: Redo every cell, even if its outputs are up to date [5]')
+    print('\t-d: Share one long-lived daemon per authority and policy across the whole sweep [7]')
+    print('\t-l: Check stricter policies with the authority only against passwords that weaker ones let through [8]')
+    print('\t-nocache: Ask the authority about every password, rather than only those it hasn\'t been asked about before [6]')
     print('\t-h: Show this help screen')
     print('Notes:')
     print('\t[1]: Trusted mode does uses pure Python for dataset filtration. It has pros and cons:')
@@ -33,66 +44,82 @@ def print_help ():
     print('\t\t+ It\'s standalone, and doesn\'t require a Skeptic Authority or rely on inter-process communication')
     print('\t\t- It\'s less flexible, and doesn\'t support the specification of arbitrary policies')
     print('\t\t- It\'s obviousy not formally verified')
+    print('\t[2]: Policies are defined by name as in \'' + POLICY_FILE + '\', for example:')
+    print('\t\t{"comp8": {"length": 8, "classes": 4, "dict": "./dict/openwall-tiny.dict"}}')
+    print('\t[3]: Extraneous mode otherwise adds a single row with an extra `count` column, standing for that many random')
+    print('\t\tpasswords with the same probability, which optimalguess.py and zipf.py understand')
+    print('\t[4]: Defaults to the number of CPUs, output is the same however many tasks run at once')
+    print('\t[5]: Outputs are recorded in \'' + MANIFEST_FILE_NAME + '\' in the output directory, keyed by the input file, policy')
+    print('\t\tdefinition, mode plugin source and tool version, so reruns only redo cells where any of these changed')
+    print('\t[6]: Verdicts are cached by authority binary, policy and password in \'.pyrrho/verdicts.sqlite\' next to the authority')
+    print('\t[7]: Daemons (see authd.py) are started as needed, and exit after a minute without clients')
+    print('\t[8]: Always done in trusted mode. With an authority, assumes it implements policies as defined in \'' + POLICY_FILE + '\'')
+    print('\t\t(or the passed policy file), where one policy implies another if all its minimums and requirements are stricter')
+
+
+def unpack_policy (name, policies):
+    """ Returns a trusted-mode policy based on a policy name.
 
-
-# The total number of times to attempt to run the filtration script.
-FILT_RUN_RETRIES = 5
+    Args:
+        name (str): The policy name.
+        policies (dict): The known policies, keyed by name.
+    Return:
+        Policy: The policy, or none if it isn't defined.
+    """
+    if not name in policies:
+        print(f'Policy \'{name}\' is not defined for trusted mode, add it to \'{POLICY_FILE}\' or pass a policy file. Skipping it...', file=sys.stderr)
+        return None
+    return policies[name]
 
 
-def compute_out_path (dir, file, policy, mode, ext='csv'):
-    """ Computes the name of a file to write renormalized data to.
+def unpack_digest (what, fn, *args):
+    """ Computes part of the key of a cell of the sweep, reporting rather than raising any error.
 
     Args:
-        dir (str): The base output directory path.
-        file (str): The name of the original file.
-        policy (str): The name of the policy used to filter the data.
-        mode (str): The reselection mode used.
-        ext (str): The file extension to use.
+        what (str): A description of what is being hashed, for the error message.
+        fn (function): The function that computes the hash (e.g. `policy_digest`).
+        *args: The arguments to pass to the function.
+    Return:
+        str: The hex digest of the hash, or none if it couldn't be computed.
     """
-    file_name = os.path.splitext(os.path.basename(file))[0]
-    file_name += f'_{policy}_{mode}.{ext}'
-    return os.path.join(dir, file_name)
+    try:
+        return fn(*args)
+    except (OSError, ImportError) as err:
+        print(f'Could not hash {what} ({err}), skipping the cells that need it...', file=sys.stderr)
+        return None
 
 
-def unpack_policy (name):
-    """ Returns a list of flags for invoking `policyfilt.py` based on a policy name.
+def report (key, result):
+    """ Reports on a finished task in the sweep.
 
     Args:
-        name (str): The policy name.
-    Return:
-        list of str: The list of flags.
+        key (tuple): The key of the task, a (file, policy) pair for filtration or a (file, policy, mode) triple.
+        result (object): The result of the task.
     """
-    return list(map(str, {
-        'basic7': ['-n', 7],
-        'basic8': ['-n', 8],
-        'basic9': ['-n', 9],
-        'basic10': ['-n', 10],
-        'basic12': ['-n', 12],
-        'basic14': ['-n', 14],
-        'basic16': ['-n', 16],
-        'basic20': ['-n', 20],
-        'digit7': ['-n', 7, '-d', 1],
-        'digit8': ['-n', 8, '-d', 1],
-        'digit9': ['-n', 9, '-d', 1],
-        'digit10': ['-n', 10, '-d', 1],
-        'upper7': ['-n', 7, '-u', 1],
-        'upper8': ['-n', 8, '-u', 1],
-        'upper9': ['-n', 9, '-u', 1],
-        'upper10': ['-n', 10, '-u', 1],
-        'symbol7': ['-n', 7, '-s', 1],
-        'symbol8': ['-n', 8, '-s', 1],
-        'symbol9': ['-n', 9, '-s', 1],
-        'symbol10': ['-n', 10, '-s', 1],
-        '2word12': ['-n', 12, '-w', 2],
-        '2word16': ['-n', 16, '-w', 2],
-        '2class12': ['-n', 12, '-c', 2],
-        '2class16': ['-n', 16, '-c', 2],
-        '3class12': ['-n', 12, '-c', 3],
-        '3class16': ['-n', 16, '-c', 3],
-        'dictionary8': ['-n', 8, '-dict', './dict/openwall-tiny.dict'],
-        'comp8': ['-n', 8, '-c', 4, '-dict', './dict/openwall-tiny.dict'],
-        # NOTE: Add to this list for custom policies if required.
-    }[name]))
+    if len(key) == 2:
+        file, policy = key
+        print('Filtered', file, 'for policy:', policy)
+        if result is None or result[0].is_empty():
+            print('Redistribution of probability was not possible for', file, 'under', policy, 'possibly because everything was filtered.')
+        return
+    if result:
+        print('Reselected, projected and fitted', *key)
+    # Record finished cells straight away, so an interrupted sweep can pick up where it left off.
+    if result is not None:
+        manifest.record(cell_name(*key), cell_keys[key], result)
+
+
+def cell_name (file, policy, mode):
+    """ Computes the name by which a cell of the sweep is recorded in the manifest.
+
+    Args:
+        file (str): The path of the input file.
+        policy (str): The name of the policy.
+        mode (str): The reselection mode.
+    Returns:
+        str: The cell name.
+    """
+    return f'{file}:{policy}:{mode}'
 
 
 # If no options specified, print usage and exit.
@@ -108,54 +135,78 @@ if is_arg_passed('h'):
 # Trusted mode or not?
 trusted = is_arg_passed('t')
 
+# Write out literal passwords in place of rows standing for many?
+materialise = is_arg_passed('x')
+
+# Load named policy definitions, letting any passed policy file add to or override them.
+policies = Policy.load(POLICY_FILE)
+if is_arg_passed('p'):
+    policies.update(Policy.load(get_valued_arg('p')))
+
+# Check the verdict cache before asking the authority?
+cached = not is_arg_passed('nocache')
+
+# Share a daemon per authority and policy, rather than launching the authority for each filtration?
+daemon = is_arg_passed('d')
+
+# Run this many tasks at once.
+jobs = get_int_valued_arg('j') or os.cpu_count() or 1
+
+# Modes plugin directory needs to go in our path.
+sys.path.insert(0, './modes/')
+
 # Load task from file.
 task = Task.load(sys.argv[-1])
 
-# For each file the task specifies.
+# Load the record of what's already been done, which is kept up to date even when asked to redo everything.
+manifest = Manifest.load(task.out)
+redo = is_arg_passed('f')
+
+# Find policies that imply others, so they only need checking against what the weaker ones let through.
+if trusted:
+    definitions = {policy: unpack_policy(policy, policies) for policy in task.policies}
+    # Undefined policies are left out of the sweep, rather than stopping it.
+    definitions = {policy: definition for policy, definition in definitions.items() if definition is not None}
+    task.policies = [policy for policy in task.policies if policy in definitions]
+else:
+    definitions = {policy: policies[policy] for policy in task.policies if policy in policies} if is_arg_passed('l') else {}
+parents = {policy: [] for policy in task.policies}
+parents.update(policy_parents(definitions))
+
+# Build the sweep, filtering once per file and policy as the result doesn't depend on reselection mode.
+scheduler = Scheduler(jobs)
+cell_keys = {}
+mode_digests = {mode: unpack_digest(f'reselection mode \'{mode}\'', mode_digest, mode) for mode in task.modes}
+task.modes = [mode for mode in task.modes if mode_digests[mode] is not None]
 for file in task.files:
-    print('Now working on file:', file)
-    # For each policy the task specifies.
+    file_hash = unpack_digest(f'input file \'{file}\'', file_digest, file)
+    if file_hash is None:
+        continue
+    needed = {}
     for policy in task.policies:
-        print('Reselecting for policy:', policy)
-        # For each mode the task specifies.
+        policy_hash = unpack_digest(f'policy \'{policy}\'', policy_digest, policy, task.authority,
+            definitions.get(policy) if trusted else None)
+        if policy_hash is None:
+            continue
+        # Key each cell by everything its outputs depend on, skipping those that are already up to date.
+        modes = []
         for mode in task.modes:
-            print('In mode', mode, f'({mode}) reselecting...')
-            # Run policy filtration/distribution renormalization script.
-            out_path = compute_out_path(task.out, file, policy, mode)
-            retries = 0
-            success = False
-            while not success and retries <= FILT_RUN_RETRIES: # We might need to retry this several times.
-                try:
-                    if trusted:
-                        # Pure Python policy filtration.
-                        subprocess.check_output(['python3', 'policyfilt.py'] + unpack_policy(policy) + [
-                            '-m', mode,
-                            '-o', out_path,
-                            file])
-                    else:
-                        # Filter using an application extracted from Coq.
-                        subprocess.check_output(['python3', 'authfilt.py',
-                            '-a', task.authority,
-                            '-p', policy,
-                            '-m', mode,
-                            '-o', out_path,
-                            file])
-                    success = True
-                except:
-                    print(f'Authority filtration process died. Retrying (attempt {retries + 1} of {FILT_RUN_RETRIES})...')
-                    time.sleep(2 * (retries + 1)) # Wait, GC might need to run or something.
-                retries += 1
-            # If redistributed probability file was produced.
-            if os.path.isfile(out_path):
-                # Run optimal attack projection, sampling at percentiles.
-                print('Running optimal attack projection (percentile sampling)...')
-                subprocess.check_output(['python3', 'optimalguess.py', '-c',
-                    '-o', compute_out_path(task.out, file, policy, mode, 'log'),
-                    out_path])
-                # Fit equation to altered distribution.
-                print('Fitting equation to altered probability distribution...')
-                subprocess.check_output(['python3', 'zipf.py',
-                    '-s', '-eq', compute_out_path(task.out, file, policy, mode, 'json'),
-                    out_path])
-            else:
-                print('Redistribution of probability was not possible for', file, 'under', policy, 'possibly because everything was filtered.')
+            cell_keys[(file, policy, mode)] = digest(TOOL_VERSION, file_hash, policy_hash, mode_digests[mode], materialise)
+            if redo or not manifest.is_current(cell_name(file, policy, mode), cell_keys[(file, policy, mode)]):
+                modes.append(mode)
+        if len(modes) < len(task.modes):
+            print('Skipping', len(task.modes) - len(modes), 'up-to-date mode(s) for', file, 'under', policy)
+        # Only filter if some cell needs it.
+        if modes:
+            needed[policy] = modes
+    # Filter weaker policies first, then stricter ones against their survivors.
+    for policy in lattice_order(parents):
+        if policy in needed:
+            deps = tuple((file, parent) for parent in nearest_parents(parents, policy, needed))
+            filtered = scheduler.add((file, policy), filter_cell,
+                (file, policy, task.authority, definitions.get(policy) if trusted else None, cached, daemon), deps)
+            for mode in needed[policy]:
+                scheduler.add((file, policy, mode), reselect_cell, (file, policy, mode, task.out, materialise), (filtered,))
+
+# Run it.
+scheduler.run(report)
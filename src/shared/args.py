@@ -1,41 +1,46 @@
 import sys
 
 
-def is_arg_passed (name):
+def is_arg_passed (name, argv=None):
     """ Returns true if an argument was passed, or false otherwise.
     Args:
         name (str): The name of the argument.
+        argv (list of str): The argument list to search (`sys.argv` by default).
     Returns:
         str: True if a the argument was passed, or false otherwise.
     """
+    argv = sys.argv if argv is None else argv
     arg = '-' + name
-    return arg in sys.argv
+    return arg in argv
 
 
-def get_valued_arg (name):
+def get_valued_arg (name, argv=None):
     """ Returns the value of a valued argument, or none if that argument was not passed.
     Args:
         name (str): The name of the argument.
+        argv (list of str): The argument list to search (`sys.argv` by default).
     Returns:
         str: The value of the argument, or none if it was not passed.
     """
+    argv = sys.argv if argv is None else argv
     arg = '-' + name
     out = None
-    if is_arg_passed(name):
-        i = sys.argv.index(arg)
-        if len(sys.argv) > i:
-            out = sys.argv[i + 1]
+    if is_arg_passed(name, argv):
+        i = argv.index(arg)
+        if len(argv) > i:
+            out = argv[i + 1]
     return out
 
 
-def get_int_valued_arg (name):
+def get_int_valued_arg (name, argv=None):
     """ Returns the value of a valued argument as an integer, or none if that argument was not passed.
     Args:
         name (str): The name of the argument.
+        argv (list of str): The argument list to search (`sys.argv` by default).
     Returns:
         str: The value of the argument as an integer, or none if it was not passed.
     """
-    value = get_valued_arg(name)
+    value = get_valued_arg(name, argv)
     if not value is None:
         value = int(value)
     return value
@@ -2,40 +2,18 @@ import sys
 import os
 import json
 
-import pandas as pd
-import matplotlib.pyplot as plt
-
-from pylab import log10
-from scipy import optimize
+from engine.distribution import load_distribution
+from engine.fitting import rank_values, fit_powerlaw
 
 from shared.args import get_valued_arg, is_arg_passed, get_int_valued_arg
 
 
-def sample (x, y, c=0, e=0):
-    """ Performs logarithmic sampling on the given data.
-    Args:
-        x (list of float): The x-values.
-        y (list of float): The y-values.
-        c (int): The current offset in the data.
-        e (int): The current exponent.
-    Returns:
-        pair: The sampled x and y values, in a pair.
-    """
-    if c > len(x):
-        return ([], []) # Length of data exceeded, return.
-    w = 2 ** e # Calculate sample interval.
-
-    # Recursively bin data.
-    nx, ny = sample(x, y, c + w, e + 1)
-    return ([x[c]] + nx, [y[c]] + ny)
-
-
 def print_usage (show_help_line=False):
     """ Prints the short help card for the program.
     Args:
         show_help_line (bool): If true, information on help flag `-h` will be printed.
     """
-    print('Usage: python zipf.py [-hcls] [-o <outfile>] [-eq <eqfile>] [-t <title>] <infile>')
+    print('Usage: python zipf.py [-hcls] [-avg] [-lsq] [-base <base>] [-o <outfile>] [-eq <eqfile>] [-t <title>] <infile>')
     print('Fits a powerlaw equation to a password frequency distribution.')
     if show_help_line:
         print('For extended help use \'-h\' option.')
@@ -50,11 +28,14 @@ def print_help ():
     print('Options:')
     print('\t-h: Show this help screen')
     print('\t-c: Disable binning')
+    print('\t-base <float>: The factor by which each bin is wider than the last (2 by default)')
+    print('\t-avg: Average values within each bin instead of sampling the first')
     print('\t-l: Disable fitting line')
+    print('\t-lsq: Fit iteratively with SciPy instead of in closed form')
     print('\t-o <str>: The file in which to place output figure')
     print('\t-eq <str>: Specify the output file in which to serialize the regression line equation')
     print('\t-t <str>: The plot title')
-    print('\t-s: Suppress the plot window')
+    print('\t-s: Suppress the plot window (if no figure is output either, no plotting libraries are loaded)')
     print()
     print('Input file should be in CSV format:')
     print('\tpassword, frequency, ... <- Column headers')
@@ -85,54 +66,27 @@ if not os.path.isfile(file):
 no_binning_mode = is_arg_passed('c') # Should we avoid binning?
 hide_fitting_line = is_arg_passed('l') # Should we hide the fitting line?
 suppress_chart = is_arg_passed('s') # Should we suppress showing the chart?
+average_bins = is_arg_passed('avg') # Should we average within bins?
+method = 'leastsq' if is_arg_passed('lsq') else 'lstsq' # Should we fit with SciPy?
 
 # Get passed values.
 out = get_valued_arg('o') # Get output path if one was specified.
 eq_out = get_valued_arg('eq') # Get equation output path if one was specified.
 title = get_valued_arg('t') # Set the title if one was specified.
+base = float(get_valued_arg('base')) if is_arg_passed('base') else 2 # Get bin base if one was specified.
 
-# Read data frame from file.
-df = pd.read_csv(file, skipinitialspace=True, skip_blank_lines=True, encoding='latin-1')
-
-# Sort by frequency.
-df.sort_values(by=['probability'], ascending=False, inplace=True)
-df.reset_index(drop=True, inplace=True)
-
-# Get raw frequency values (these go on the Y axis).
-ry = df['probability']
+# Read data frame from file, sorted by probability.
+df = load_distribution(file, encoding='latin-1')
 
-# Generate ranks (these go on the X axis) and cast to floats.
-rx = range(1, len(ry) + 1)
-rx = list(map(lambda j: float(j), rx))
+# Get rank (x) and probability (y) values, binned unless asked not to.
+x, y = rank_values(df, not no_binning_mode, base, average_bins)
 
-# Bin values.
-if no_binning_mode:
-    x, y = rx, ry
-else:
-    x, y = sample(rx, ry)
-
-# It's much better to perform a least-squares fit on the logarithms.
-logx = log10(x)
-logy = log10(y)
-
-# Specify fitting and error functions.
-fitting_func = lambda p, x: p[0] + p[1] * x
-error_func = lambda p, x, y: y - fitting_func(p, x)
-
-# Least squares fitting.
-params_init = [1.0, -1.0]
-fit = optimize.leastsq(error_func, params_init, args=(logx, logy), full_output=1)
-
-# Get final params.
-params_final = fit[0]
-covar = fit[1] # TODO: What's this?
-
-# Get alpha and amplitude.
-alpha = params_final[1]
-amp = 10.0 ** params_final[0]
+# Fit power law, getting alpha and amplitude.
+output = fit_powerlaw(x, y, method)
+amp = output['amp']
+alpha = output['alpha']
 
 # Dump output structure to standard output.
-output = {'amp': amp, 'alpha': alpha}
 print(json.dumps(output))
 
 # Write equation file if required.
@@ -141,6 +95,16 @@ if not eq_out is None:
     print(json.dumps(output), file=eq_out_file)
     eq_out_file.close()
 
+# Nothing more to do without a plot.
+if suppress_chart and out is None:
+    exit(0)
+
+# Load plotting libraries only now they're needed, without needing a display if the plot won't be shown.
+import matplotlib
+if suppress_chart:
+    matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
 # Create function for regression line.
 powerlaw = lambda x, amp, alpha: amp * (x ** alpha)
 
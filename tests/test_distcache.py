@@ -0,0 +1,44 @@
+import os
+import sys
+import mmap
+
+import numpy as np
+import pandas as pd
+
+# Tests run against the code under `/src`.
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from engine import distcache
+from engine.distribution import load_distribution
+
+
+def write_distribution (file):
+    """ Writes a small, unsorted distribution with a missing password to a CSV file.
+    """
+    df = pd.DataFrame({'password': ['abc', 'password', None, 'letmein'], 'count': [3, 10, 1, 6]})
+    df['probability'] = df['count'] / df['count'].sum()
+    df.to_csv(file, index=False)
+
+
+def is_mapped (values):
+    """ Checks whether or not an array's memory belongs to a memory-mapped file, rather than a copy of it.
+    """
+    base = values
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return isinstance(base, mmap.mmap)
+
+
+def test_load_maps_numeric_columns_without_copying (tmp_path):
+    file = str(tmp_path / 'dist.csv')
+    write_distribution(file)
+    parsed = load_distribution(file)
+    path = distcache.lookup(file)
+    assert path is not None
+    cached = distcache.load(path)
+    for column in distcache.read_meta(path)['columns']:
+        if column['kind'] == 'numeric':
+            assert is_mapped(cached[column['name']].to_numpy()), column['name']
+    # Loading the cached copy gives the same data frame as parsing the file.
+    pd.testing.assert_frame_equal(cached, parsed, check_dtype=False)
@@ -0,0 +1,71 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Tests run against the code under `/src`, which expects to run from there.
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from composition.charclass import analyse
+from composition.pindates import is_date
+from composition.policy import complies
+from composition.vectorized import complies_mask, analyse_series, ANALYSE_MAX_WIDTH
+from engine.features import FeatureMatrix, compact
+from model.Policy import Policy, POLICY_FILE
+
+
+# The distribution to check against.
+DATA_PATH = os.path.join(SRC_DIR, '..', 'data', 'singles.probs')
+
+# Strings that take the slow paths: non-ASCII, containing null characters, too long to analyse in a block, dates.
+AWKWARD = ['héllo1A!', 'ÅBC', 'Straße99', 'Ωmega2024', '\0a', 'a\0', 'pass\0word', '', 'aab', 'abcd', '121290',
+    '311299', '999999', 'x' * (ANALYSE_MAX_WIDTH + 1), 'Aa1!' * ANALYSE_MAX_WIDTH, 'two words here', '12ab34CD!!']
+
+
+@pytest.fixture(autouse=True)
+def in_src_dir (monkeypatch):
+    """ Runs each test from `/src`, where policy dictionary paths are relative to.
+    """
+    monkeypatch.chdir(SRC_DIR)
+
+
+@pytest.fixture(scope='module')
+def pwds ():
+    """ Gets the passwords of the sample distribution, plus awkward ones.
+    """
+    df = pd.read_csv(DATA_PATH, skipinitialspace=True, skip_blank_lines=True)
+    return pd.Series(list(df['password'].map(str)) + AWKWARD, dtype=object)
+
+
+def policies ():
+    """ Gets every named policy, plus one with every special requirement that doesn't need a dictionary.
+    """
+    named = list(Policy.load(os.path.join(SRC_DIR, POLICY_FILE)).values())
+    return named + [Policy('special', ['norep', 'noconsec', 'nodate'], length=6, lowers=1, words=1, letters=2)]
+
+
+@pytest.mark.parametrize('policy', policies(), ids=lambda policy: policy.name)
+def test_complies_mask_matches_complies (pwds, policy):
+    expected = np.array([complies(pwd, **policy.kwargs()) for pwd in pwds], dtype=bool)
+    assert (complies_mask(pwds, **policy.kwargs()) == expected).all()
+
+
+def test_analyse_series_matches_analyse (pwds):
+    features = analyse_series(pwds)
+    for i, pwd in enumerate(pwds):
+        expected = analyse(pwd)._asdict()
+        expected['is_date'] = is_date(pwd)
+        assert {field: features[field][i] for field in expected} == expected, repr(pwd)
+
+
+@pytest.mark.parametrize('policy', policies(), ids=lambda policy: policy.name)
+def test_feature_mask_matches_policy_mask (pwds, policy):
+    matrix = FeatureMatrix({name: compact(values) for name, values in analyse_series(pwds).items()}, pwds)
+    for invert in [False, True]:
+        assert (matrix.mask(policy, invert) == policy.mask(pwds, invert)).all()
+    # Checking only some rows gives the same answers for those rows.
+    rows = np.arange(0, len(pwds), 3)
+    assert (matrix.mask(policy, rows=rows) == policy.mask(pwds)[rows]).all()